@@ -1,5 +1,6 @@
 import { describe, it, expect, beforeAll, afterAll } from 'vitest';
 import { FastifyInstance } from 'fastify';
+import { FpdService } from '@fpd-editor/core';
 import { buildApp } from '../server.js';
 
 /** Minimal valid FPD source for testing. */
@@ -19,6 +20,32 @@ const RICH_SOURCE = [
     '@endfpd',
 ].join('\n');
 
+/** Two systems with placements, every flow kind and a cross-system flow. */
+const SYSTEMS_SOURCE = [
+    '@startfpd',
+    'title "Two plants"',
+    'system "Plant A" {',
+    '    product a_in "Raw" @boundary',
+    '    energy a_pow "Power"',
+    '    process_operator a_po "Cut"',
+    '    technical_resource a_tr "Laser"',
+    '    product a_out "Part"',
+    '    a_in --> a_po',
+    '    a_pow -.-> a_po',
+    '    a_po ==> a_out',
+    '    a_po <..> a_tr',
+    '}',
+    'system "Plant B" {',
+    '    product b_in "Part in" @internal',
+    '    process_operator b_po "Weld"',
+    '    information b_log "Log"',
+    '    b_in --> b_po',
+    '    b_po --> b_log',
+    '}',
+    'a_out --> b_in',
+    '@endfpd',
+].join('\n');
+
 /** FPD source with deliberate syntax errors (unknown keyword). */
 const INVALID_SYNTAX_SOURCE = '@startfpd\nfoobar baz\n@endfpd';
 
@@ -128,6 +155,22 @@ describe('POST /api/export/source/xml', () => {
         expect(res.headers['content-type']).toContain('application/xml');
         expect(res.body).toContain('<?xml');
     });
+
+    it('returns indented XML unless pretty=false is requested', async () => {
+        const pretty = await app.inject({
+            method: 'POST',
+            url: '/api/export/source/xml',
+            payload: { source: RICH_SOURCE },
+        });
+        const compact = await app.inject({
+            method: 'POST',
+            url: '/api/export/source/xml?pretty=false',
+            payload: { source: RICH_SOURCE },
+        });
+        expect(pretty.body).toContain('\n  <fpb:process');
+        expect(compact.body).not.toContain('\n');
+        expect(compact.body.length).toBeLessThan(pretty.body.length);
+    });
 });
 
 describe('POST /api/export/source/text', () => {
@@ -227,6 +270,44 @@ describe('POST /api/import', () => {
     });
 });
 
+// The parse and import routes serialize with hand-written response schemas,
+// which silently drop any property they do not list. Comparing against the
+// service result catches fields missing from those schemas.
+describe('Response serialization', () => {
+    const service = new FpdService();
+
+    it('POST /api/parse returns every field of the parse result', async () => {
+        const res = await app.inject({
+            method: 'POST',
+            url: '/api/parse',
+            payload: { source: SYSTEMS_SOURCE },
+        });
+        expect(res.statusCode).toBe(200);
+        expect(res.json()).toEqual(service.parse(SYSTEMS_SOURCE));
+    });
+
+    it('POST /api/import returns every field of a text import', async () => {
+        const res = await app.inject({
+            method: 'POST',
+            url: '/api/import',
+            payload: { content: SYSTEMS_SOURCE, filename: 'plants.fpd' },
+        });
+        expect(res.statusCode).toBe(200);
+        expect(res.json()).toEqual(service.importFile(SYSTEMS_SOURCE, 'plants.fpd'));
+    });
+
+    it('POST /api/import returns every field of an XML import', async () => {
+        const xml = service.exportXml(SYSTEMS_SOURCE);
+        const res = await app.inject({
+            method: 'POST',
+            url: '/api/import',
+            payload: { content: xml, filename: 'plants.xml' },
+        });
+        expect(res.statusCode).toBe(200);
+        expect(res.json()).toEqual(service.importFile(xml, 'plants.xml'));
+    });
+});
+
 describe('POST /api/export/source/pdf', () => {
     it('returns PDF for valid source', async () => {
         const res = await app.inject({
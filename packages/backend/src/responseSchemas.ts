@@ -0,0 +1,152 @@
+/**
+ * JSON schemas for response serialization.
+ *
+ * Fastify compiles these with fast-json-stringify, which is considerably
+ * faster than the generic JSON.stringify fallback for large models. Only
+ * properties listed here are serialized, so keep them in sync with the
+ * core model and layout interfaces.
+ */
+
+const str = { type: 'string' } as const;
+const num = { type: 'number' } as const;
+const bool = { type: 'boolean' } as const;
+
+const identification = {
+    type: 'object',
+    properties: { uniqueIdent: str, longName: str, shortName: str },
+} as const;
+
+const elementBase = {
+    id: str,
+    identification,
+    label: str,
+    lineNumber: num,
+    systemId: str,
+} as const;
+
+const processModel = {
+    type: 'object',
+    properties: {
+        title: str,
+        systemLimits: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: { id: str, identification, label: str, lineNumber: num },
+            },
+        },
+        states: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: { ...elementBase, stateType: str, placement: str },
+            },
+        },
+        processOperators: {
+            type: 'array',
+            items: { type: 'object', properties: elementBase },
+        },
+        technicalResources: {
+            type: 'array',
+            items: { type: 'object', properties: elementBase },
+        },
+        flows: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: {
+                    id: str,
+                    sourceRef: str,
+                    targetRef: str,
+                    flowType: str,
+                    lineNumber: num,
+                    systemId: str,
+                },
+            },
+        },
+        usages: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: {
+                    id: str,
+                    processOperatorRef: str,
+                    technicalResourceRef: str,
+                    lineNumber: num,
+                    systemId: str,
+                },
+            },
+        },
+        errors: { type: 'array', items: str },
+        warnings: { type: 'array', items: str },
+    },
+} as const;
+
+const systemLimitRectProperties = {
+    id: str,
+    label: str,
+    x: num,
+    y: num,
+    width: num,
+    height: num,
+} as const;
+
+const diagramLayout = {
+    type: 'object',
+    properties: {
+        elements: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: {
+                    id: str,
+                    type: str,
+                    label: str,
+                    x: num,
+                    y: num,
+                    width: num,
+                    height: num,
+                    stateType: str,
+                    lineNumber: num,
+                },
+            },
+        },
+        connections: {
+            type: 'array',
+            items: {
+                type: 'object',
+                properties: {
+                    id: str,
+                    sourceId: str,
+                    targetId: str,
+                    flowType: str,
+                    isUsage: bool,
+                    isCrossSystem: bool,
+                    sourceSide: str,
+                    targetSide: str,
+                    lineNumber: num,
+                },
+            },
+        },
+        systemLimits: {
+            type: 'array',
+            items: { type: 'object', properties: systemLimitRectProperties },
+        },
+        systemLimit: {
+            type: ['object', 'null'],
+            properties: systemLimitRectProperties,
+        },
+    },
+} as const;
+
+/** Success response of `POST /parse`. */
+export const parseResponseSchema = {
+    type: 'object',
+    properties: { model: processModel, diagram: diagramLayout },
+} as const;
+
+/** Success response of `POST /import`. */
+export const importResponseSchema = {
+    type: 'object',
+    properties: { model: processModel, diagram: diagramLayout, source: str },
+} as const;
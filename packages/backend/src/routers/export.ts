@@ -1,12 +1,16 @@
 /** Export endpoints: SVG, XML, PDF, text. */
 
 import { FastifyInstance, FastifyRequest, FastifyReply } from 'fastify';
-import { sourceSchema } from '../schemas.js';
+import { sourceSchema, xmlExportQuerySchema } from '../schemas.js';
 import '../types.js';
 
 /** Helper that validates the source field and delegates to a handler. */
 function withSourceValidation(
-    handler: (source: string, reply: FastifyReply) => unknown | Promise<unknown>,
+    handler: (
+        source: string,
+        reply: FastifyReply,
+        request: FastifyRequest,
+    ) => unknown | Promise<unknown>,
 ) {
     return async (request: FastifyRequest, reply: FastifyReply) => {
         const parsed = sourceSchema.safeParse(request.body);
@@ -14,7 +18,7 @@ function withSourceValidation(
             return reply.status(400).send({ error: parsed.error.issues[0].message });
         }
         try {
-            return await handler(parsed.data.source, reply);
+            return await handler(parsed.data.source, reply, request);
         } catch (err) {
             request.log.error(err);
             return reply.status(422).send({ error: 'Processing error' });
@@ -35,8 +39,15 @@ export async function exportRouter(app: FastifyInstance) {
 
     app.post(
         '/export/source/xml',
-        withSourceValidation((source, reply) => {
-            const xml = service.exportXml(source);
+        withSourceValidation((source, reply, request) => {
+            const query = xmlExportQuerySchema.safeParse(request.query);
+            if (!query.success) {
+                return reply
+                    .status(400)
+                    .send({ error: 'Query parameter "pretty" must be a boolean' });
+            }
+            // Indented by default; clients opt into compact output with pretty=false
+            const xml = service.exportXml(source, { pretty: query.data.pretty ?? true });
             return reply.type('application/xml').send(xml);
         }),
     );
@@ -53,7 +64,9 @@ export async function exportRouter(app: FastifyInstance) {
         '/export/source/pdf',
         withSourceValidation(async (source, reply) => {
             const pdfBytes = await service.exportPdf(source);
-            return reply.type('application/pdf').send(Buffer.from(pdfBytes));
+            // Wrap the existing bytes instead of copying them into a new Buffer
+            const body = Buffer.from(pdfBytes.buffer, pdfBytes.byteOffset, pdfBytes.byteLength);
+            return reply.type('application/pdf').send(body);
         }),
     );
 }
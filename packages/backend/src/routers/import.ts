@@ -2,24 +2,23 @@
 
 import { FastifyInstance } from 'fastify';
 import { importSchema } from '../schemas.js';
+import { importResponseSchema } from '../responseSchemas.js';
 import '../types.js';
 
 export async function importRouter(app: FastifyInstance) {
     const service = app.fpdService;
 
-    app.post('/import', async (request, reply) => {
+    const schema = { response: { 200: importResponseSchema } };
+
+    app.post('/import', { schema }, async (request, reply) => {
         const parsed = importSchema.safeParse(request.body);
         if (!parsed.success) {
             return reply.status(400).send({ error: parsed.error.issues[0].message });
         }
 
         try {
-            const result = service.importFile(parsed.data.content, parsed.data.filename);
-            return {
-                model: result.model,
-                diagram: result.diagram,
-                source: result.source,
-            };
+            // The response schema picks the fields to serialize; no need to copy them
+            return service.importFile(parsed.data.content, parsed.data.filename);
         } catch (err) {
             request.log.error(err);
             return reply.status(422).send({ error: 'Processing error' });
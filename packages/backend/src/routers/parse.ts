@@ -2,20 +2,24 @@
 
 import { FastifyInstance } from 'fastify';
 import { sourceSchema } from '../schemas.js';
+import { parseResponseSchema } from '../responseSchemas.js';
 import '../types.js';
 
 export async function parseRouter(app: FastifyInstance) {
     const service = app.fpdService;
 
-    app.post('/parse', async (request, reply) => {
+    const schema = { response: { 200: parseResponseSchema } };
+
+    app.post('/parse', { schema }, async (request, reply) => {
         const parsed = sourceSchema.safeParse(request.body);
         if (!parsed.success) {
             return reply.status(400).send({ error: parsed.error.issues[0].message });
         }
 
         try {
-            const result = service.parse(parsed.data.source);
-            return { model: result.model, diagram: result.diagram };
+            // Only serialized, never mutated, so an unchanged source can reuse
+            // the cached parse and layout
+            return service.parseShared(parsed.data.source);
         } catch (err) {
             app.log.error(err);
             return reply.status(422).send({ error: 'Processing error' });
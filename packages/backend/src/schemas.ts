@@ -25,5 +25,10 @@ export const importSchema = z.object({
         .max(255, 'Filename too long'),
 });
 
+/** Query parameters of the XML export endpoint. */
+export const xmlExportQuerySchema = z.object({
+    pretty: z.stringbool().optional(),
+});
+
 export type SourceInput = z.infer<typeof sourceSchema>;
 export type ImportInput = z.infer<typeof importSchema>;
@@ -90,6 +90,18 @@ describe('exportText', () => {
         expect(text).toContain('information i1 "Info"');
     });
 
+    it('skips states whose type names an Object prototype member', () => {
+        const model = build((m) => {
+            m.states.push(makeState('p1'));
+            m.states.push({ ...makeState('c1'), stateType: 'constructor' as State['stateType'] });
+            m.states.push({ ...makeState('t1'), stateType: 'toString' as State['stateType'] });
+        });
+        const text = exportText(model);
+        expect(text).toContain('product p1 "p1"');
+        expect(text).not.toContain('c1');
+        expect(text).not.toContain('t1');
+    });
+
     it('exports process operators and technical resources', () => {
         const model = build((m) => {
             m.processOperators.push(makePO('po1', { label: 'Cut' }));
@@ -179,6 +191,28 @@ describe('exportText', () => {
         expect(flowLine!.startsWith('s1')).toBe(true);
     });
 
+    it('keeps interleaved elements in their own system blocks', () => {
+        const model = build((m) => {
+            for (const id of ['sys1', 'sys2']) {
+                m.systemLimits.push({ id, identification: { uniqueIdent: id }, label: id });
+            }
+            m.processOperators.push(makePO('po2', { systemId: 'sys2' }));
+            m.processOperators.push(makePO('po1', { systemId: 'sys1' }));
+            m.states.push(makeState('s2', 'product', { systemId: 'sys2' }));
+            m.states.push(makeState('s1', 'product', { systemId: 'sys1' }));
+            m.flows.push(makeFlow('s2', 'po2', { systemId: 'sys2' }));
+            m.flows.push(makeFlow('s1', 'po1', { systemId: 'sys1' }));
+        });
+        const text = exportText(model);
+        const [sys1Block, sys2Block] = text.split('system "sys2" {');
+        expect(sys1Block).toContain('  product s1');
+        expect(sys1Block).toContain('  s1 --> po1');
+        expect(sys1Block).not.toContain('po2');
+        expect(sys2Block).toContain('  product s2');
+        expect(sys2Block).toContain('  s2 --> po2');
+        expect(sys2Block).not.toContain('po1');
+    });
+
     it('produces parseable output (round-trip)', () => {
         const model = build((m) => {
             m.title = 'Round Trip';
@@ -200,4 +200,18 @@ describe('exportXml', () => {
         expect(result.model.flows).toHaveLength(2);
         // Note: usages don't round-trip in HSU format (no entry/exit bindings)
     });
+
+    it('emits compact XML with the same content when pretty is false', () => {
+        const model = build((m) => {
+            m.states.push(makeState('p1'));
+            m.processOperators.push(makePO('po1'));
+            m.flows.push(makeFlow('p1', 'po1'));
+        });
+
+        const compact = exportXml(model, { pretty: false });
+        expect(compact).not.toContain('\n');
+        expect(compact).not.toMatch(/>\s+</);
+        expect(compact).toContain('<fpb:processOperators><fpb:processOperator>');
+        expect(importXml(compact).model).toEqual(importXml(exportXml(model)).model);
+    });
 });
@@ -5,7 +5,25 @@
  * so the PDF output matches the preview exactly.
  */
 
-import { PDFDocument, PDFPage, rgb, RGB, LineCapStyle } from 'pdf-lib';
+import {
+    PDFDocument,
+    PDFOperator,
+    PDFPage,
+    rgb,
+    RGB,
+    LineCapStyle,
+    LineJoinStyle,
+    lineTo,
+    moveTo,
+    popGraphicsState,
+    pushGraphicsState,
+    setDashPattern,
+    setLineCap,
+    setLineJoin,
+    setLineWidth,
+    setStrokingColor,
+    stroke,
+} from 'pdf-lib';
 
 import { LayoutElement, SystemLimitRect, DiagramLayout } from '../services/layout';
 import {
@@ -55,6 +73,14 @@ const COLORS: Record<string, RGB> = Object.fromEntries(
     Object.entries(HEX_COLORS).map(([key, hex]) => [key, hexToRgb(hex)]),
 );
 
+// Colours used on every element, resolved once at module load
+const BLACK = COLORS['black'];
+const STATE_FILLS: Record<string, RGB> = {
+    product: COLORS['product'],
+    energy: COLORS['energy'],
+    information: COLORS['information'],
+};
+
 // ---------------------------------------------------------------------------
 // Page size helpers
 // ---------------------------------------------------------------------------
@@ -64,57 +90,110 @@ const PAGE_SIZES: Record<PageSizeOption, [number, number]> = {
     Letter: [612, 792],
 };
 
+/** Page dimensions for every size/orientation pair, precomputed at module load. */
+const PAGE_DIMENSIONS = Object.fromEntries(
+    Object.entries(PAGE_SIZES).map(([name, [w, h]]) => [
+        name,
+        { portrait: [w, h], landscape: [h, w] },
+    ]),
+) as Record<PageSizeOption, Record<OrientationOption, [number, number]>>;
+
 function getPageSize(pageSize: PageSizeOption, orientation: OrientationOption): [number, number] {
-    const [w, h] = PAGE_SIZES[pageSize] ?? PAGE_SIZES.A4;
-    if (orientation === 'landscape') {
-        return [h, w];
-    }
-    return [w, h];
+    const dims = PAGE_DIMENSIONS[pageSize] ?? PAGE_DIMENSIONS.A4;
+    return orientation === 'landscape' ? dims.landscape : dims.portrait;
 }
 
 // ---------------------------------------------------------------------------
 // PDF drawing helpers
 // ---------------------------------------------------------------------------
 
-/** Transform a diagram-space coordinate to PDF-space (flip Y). */
-function toPdfY(
-    diagramY: number,
+/**
+ * Affine diagram-space -> PDF-space transform (uniform scale, flipped Y).
+ *
+ * Folding bounds, page height and centring offsets into two translation
+ * terms up front makes each point transform a single multiply-add.
+ */
+interface PdfTransform {
+    scale: number;
+    /** PDF x-coordinate of diagram x = 0. */
+    tx: number;
+    /** PDF y-coordinate of diagram y = 0. */
+    ty: number;
+}
+
+function createTransform(
     bounds: ContentBounds,
     pageHeight: number,
     scale: number,
+    offsetX: number,
     offsetY: number,
-): number {
-    return pageHeight - ((diagramY - bounds.y) * scale + offsetY);
+): PdfTransform {
+    return {
+        scale,
+        tx: offsetX - bounds.x * scale,
+        ty: pageHeight - offsetY + bounds.y * scale,
+    };
+}
+
+function toPdfX(diagramX: number, t: PdfTransform): number {
+    return diagramX * t.scale + t.tx;
+}
+
+function toPdfY(diagramY: number, t: PdfTransform): number {
+    return t.ty - diagramY * t.scale;
 }
 
-function toPdfX(diagramX: number, bounds: ContentBounds, scale: number, offsetX: number): number {
-    return (diagramX - bounds.x) * scale + offsetX;
+/** Stroke style shared by every connection in a batch. */
+interface ConnectionStyle {
+    color: RGB;
+    dash?: number[];
 }
 
-function drawPolyline(
+type ConnectionStyleKey = 'flow' | 'usage' | 'crossSystem';
+
+const CONNECTION_STYLES: Record<ConnectionStyleKey, ConnectionStyle> = {
+    flow: { color: COLORS['flow'] },
+    usage: { color: COLORS['usage'], dash: [6, 4] },
+    crossSystem: { color: COLORS['crossSystem'], dash: [8, 4] },
+};
+
+/**
+ * Stroke many polylines sharing one style as a single PDF path.
+ *
+ * The graphics state is set once per batch instead of once per segment,
+ * which keeps the content stream small for diagrams with many flows.
+ */
+function strokePolylines(
     page: PDFPage,
-    pts: Point[],
-    color: RGB,
+    polylines: Point[][],
+    style: ConnectionStyle,
     thickness: number,
-    dash?: number[],
 ): void {
-    for (let i = 0; i < pts.length - 1; i++) {
-        page.drawLine({
-            start: { x: pts[i][0], y: pts[i][1] },
-            end: { x: pts[i + 1][0], y: pts[i + 1][1] },
-            color,
-            thickness,
-            dashArray: dash,
-            lineCap: LineCapStyle.Round,
-        });
+    if (polylines.length === 0) return;
+    const ops: PDFOperator[] = [
+        pushGraphicsState(),
+        setStrokingColor(style.color),
+        setLineWidth(thickness),
+        setDashPattern(style.dash ?? [], 0),
+        setLineCap(LineCapStyle.Round),
+        setLineJoin(LineJoinStyle.Round),
+    ];
+    for (const pts of polylines) {
+        ops.push(moveTo(pts[0][0], pts[0][1]));
+        for (let i = 1; i < pts.length; i++) {
+            ops.push(lineTo(pts[i][0], pts[i][1]));
+        }
     }
+    ops.push(stroke(), popGraphicsState());
+    page.pushOperators(...ops);
 }
 
-function drawArrowhead(page: PDFPage, tip: Point, prev: Point, color: RGB, size: number = 6): void {
+/** Build the closed triangle subpath for an arrowhead pointing from `prev` to `tip`. */
+function arrowheadPath(tip: Point, prev: Point, size: number = 6): string {
     const dx = tip[0] - prev[0];
     const dy = tip[1] - prev[1];
     const len = Math.sqrt(dx * dx + dy * dy);
-    if (len === 0) return;
+    if (len === 0) return '';
     const ux = dx / len;
     const uy = dy / len;
     const px = -uy;
@@ -123,29 +202,33 @@ function drawArrowhead(page: PDFPage, tip: Point, prev: Point, color: RGB, size:
     const left = [base[0] + (px * size) / 2, base[1] + (py * size) / 2];
     const right = [base[0] - (px * size) / 2, base[1] - (py * size) / 2];
 
-    const path = `M ${tip[0]} ${tip[1]} L ${left[0]} ${left[1]} L ${right[0]} ${right[1]} Z`;
-    page.drawSvgPath(path, { x: 0, y: 0, color, borderColor: color, borderWidth: 0.5 });
+    return `M ${tip[0]} ${tip[1]} L ${left[0]} ${left[1]} L ${right[0]} ${right[1]} Z`;
+}
+
+/** Fill all arrowheads of one colour with a single path draw. */
+function drawArrowheads(page: PDFPage, subpaths: string[], color: RGB): void {
+    if (subpaths.length === 0) return;
+    page.drawSvgPath(subpaths.join(' '), {
+        x: 0,
+        y: 0,
+        color,
+        borderColor: color,
+        borderWidth: 0.5,
+    });
 }
 
 // ---------------------------------------------------------------------------
 // Element renderers
 // ---------------------------------------------------------------------------
 
-function drawState(
-    page: PDFPage,
-    el: LayoutElement,
-    bounds: ContentBounds,
-    pageHeight: number,
-    scale: number,
-    offsetX: number,
-    offsetY: number,
-): void {
-    const cx = toPdfX(el.x + el.width / 2, bounds, scale, offsetX);
-    const cy = toPdfY(el.y + el.height / 2, bounds, pageHeight, scale, offsetY);
+function drawState(page: PDFPage, el: LayoutElement, t: PdfTransform): void {
+    const { scale } = t;
+    const cx = toPdfX(el.x + el.width / 2, t);
+    const cy = toPdfY(el.y + el.height / 2, t);
     const w = el.width * scale;
     const h = el.height * scale;
     const stateType = el.stateType || 'product';
-    const color = COLORS[stateType] || COLORS['product'];
+    const color = STATE_FILLS[stateType] || STATE_FILLS['product'];
 
     if (stateType === 'energy') {
         // Diamond
@@ -154,7 +237,7 @@ function drawState(
             x: 0,
             y: 0,
             color,
-            borderColor: COLORS['black'],
+            borderColor: BLACK,
             borderWidth: STROKE_WIDTH,
         });
     } else if (stateType === 'information') {
@@ -168,7 +251,7 @@ function drawState(
             x: 0,
             y: 0,
             color,
-            borderColor: COLORS['black'],
+            borderColor: BLACK,
             borderWidth: STROKE_WIDTH,
         });
     } else {
@@ -179,7 +262,7 @@ function drawState(
             y: cy,
             size: r,
             color,
-            borderColor: COLORS['black'],
+            borderColor: BLACK,
             borderWidth: STROKE_WIDTH,
         });
     }
@@ -195,35 +278,64 @@ function drawState(
             x: labelX - el.id.length * fontSize * 0.5,
             y: cy + h / 2 + 14 * scale,
             size: fontSize,
-            color: COLORS['black'],
+            color: BLACK,
         });
         page.drawText(label, {
             x: labelX - label.length * fontSize * 0.5,
             y: cy + h / 2 + 3 * scale,
             size: fontSize,
-            color: COLORS['black'],
+            color: BLACK,
         });
     } else {
         page.drawText(el.id, {
             x: labelX - el.id.length * fontSize * 0.5,
             y: cy + h / 2 + 6 * scale,
             size: fontSize,
-            color: COLORS['black'],
+            color: BLACK,
         });
     }
 }
 
-function drawProcessOperator(
+/**
+ * Draw the centred id (and optional name) lines inside a box-shaped element.
+ *
+ * Shared by process operators and technical resources. Each line's width is
+ * estimated once from its character count and reused for centring.
+ */
+function drawBoxLabels(
     page: PDFPage,
     el: LayoutElement,
-    bounds: ContentBounds,
-    pageHeight: number,
+    px: number,
+    py: number,
+    w: number,
+    h: number,
+    padding: number,
     scale: number,
-    offsetX: number,
-    offsetY: number,
 ): void {
-    const px = toPdfX(el.x, bounds, scale, offsetX);
-    const py = toPdfY(el.y + el.height, bounds, pageHeight, scale, offsetY);
+    const label = el.label || el.id;
+    const hasName = label !== el.id;
+    const lines = hasName ? [el.id, label] : [el.id];
+    const fontSize = autoFontSize(lines, w - padding, PROCESS_LABEL_FONT_SIZE * scale, 7 * scale);
+    const cx = px + w / 2;
+    const cy = py + h / 2;
+    const offsets = hasName ? [fontSize * 0.3, -fontSize * 0.9] : [-fontSize / 3];
+
+    for (let i = 0; i < lines.length; i++) {
+        const text = lines[i];
+        const textW = text.length * fontSize * 0.5;
+        page.drawText(text, {
+            x: cx - textW / 2,
+            y: cy + offsets[i],
+            size: fontSize,
+            color: BLACK,
+        });
+    }
+}
+
+function drawProcessOperator(page: PDFPage, el: LayoutElement, t: PdfTransform): void {
+    const { scale } = t;
+    const px = toPdfX(el.x, t);
+    const py = toPdfY(el.y + el.height, t);
     const w = el.width * scale;
     const h = el.height * scale;
 
@@ -233,59 +345,17 @@ function drawProcessOperator(
         width: w,
         height: h,
         color: COLORS['processOperator'],
-        borderColor: COLORS['black'],
+        borderColor: BLACK,
         borderWidth: STROKE_WIDTH,
     });
 
-    const label = el.label || el.id;
-    const hasName = label !== el.id;
-    const lines = hasName ? [el.id, label] : [el.id];
-    const fontSize = autoFontSize(
-        lines,
-        w - 12 * scale,
-        PROCESS_LABEL_FONT_SIZE * scale,
-        7 * scale,
-    );
-    const cx = px + w / 2;
-    const cy = py + h / 2;
-
-    if (hasName) {
-        const idW = el.id.length * fontSize * 0.5;
-        const labelW = label.length * fontSize * 0.5;
-        page.drawText(el.id, {
-            x: cx - idW / 2,
-            y: cy + fontSize * 0.3,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-        page.drawText(label, {
-            x: cx - labelW / 2,
-            y: cy - fontSize * 0.9,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-    } else {
-        const idW = el.id.length * fontSize * 0.5;
-        page.drawText(el.id, {
-            x: cx - idW / 2,
-            y: cy - fontSize / 3,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-    }
+    drawBoxLabels(page, el, px, py, w, h, 12 * scale, scale);
 }
 
-function drawTechnicalResource(
-    page: PDFPage,
-    el: LayoutElement,
-    bounds: ContentBounds,
-    pageHeight: number,
-    scale: number,
-    offsetX: number,
-    offsetY: number,
-): void {
-    const px = toPdfX(el.x, bounds, scale, offsetX);
-    const py = toPdfY(el.y + el.height, bounds, pageHeight, scale, offsetY);
+function drawTechnicalResource(page: PDFPage, el: LayoutElement, t: PdfTransform): void {
+    const { scale } = t;
+    const px = toPdfX(el.x, t);
+    const py = toPdfY(el.y + el.height, t);
     const w = el.width * scale;
     const h = el.height * scale;
 
@@ -302,59 +372,17 @@ function drawTechnicalResource(
         x: 0,
         y: 0,
         color: COLORS['technicalResource'],
-        borderColor: COLORS['black'],
+        borderColor: BLACK,
         borderWidth: STROKE_WIDTH,
     });
 
-    const label = el.label || el.id;
-    const hasName = label !== el.id;
-    const lines = hasName ? [el.id, label] : [el.id];
-    const fontSize = autoFontSize(
-        lines,
-        w - 24 * scale,
-        PROCESS_LABEL_FONT_SIZE * scale,
-        7 * scale,
-    );
-    const cx = px + w / 2;
-    const cy = py + h / 2;
-
-    if (hasName) {
-        const idW = el.id.length * fontSize * 0.5;
-        const labelW = label.length * fontSize * 0.5;
-        page.drawText(el.id, {
-            x: cx - idW / 2,
-            y: cy + fontSize * 0.3,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-        page.drawText(label, {
-            x: cx - labelW / 2,
-            y: cy - fontSize * 0.9,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-    } else {
-        const idW = el.id.length * fontSize * 0.5;
-        page.drawText(el.id, {
-            x: cx - idW / 2,
-            y: cy - fontSize / 3,
-            size: fontSize,
-            color: COLORS['black'],
-        });
-    }
+    drawBoxLabels(page, el, px, py, w, h, 24 * scale, scale);
 }
 
-function drawSystemLimit(
-    page: PDFPage,
-    sl: SystemLimitRect,
-    bounds: ContentBounds,
-    pageHeight: number,
-    scale: number,
-    offsetX: number,
-    offsetY: number,
-): void {
-    const px = toPdfX(sl.x, bounds, scale, offsetX);
-    const py = toPdfY(sl.y + sl.height, bounds, pageHeight, scale, offsetY);
+function drawSystemLimit(page: PDFPage, sl: SystemLimitRect, t: PdfTransform): void {
+    const { scale } = t;
+    const px = toPdfX(sl.x, t);
+    const py = toPdfY(sl.y + sl.height, t);
     const w = sl.width * scale;
     const h = sl.height * scale;
 
@@ -363,7 +391,7 @@ function drawSystemLimit(
         y: py,
         width: w,
         height: h,
-        borderColor: COLORS['black'],
+        borderColor: BLACK,
         borderWidth: STROKE_WIDTH,
         borderDashArray: [10, 12],
     });
@@ -374,51 +402,61 @@ function drawSystemLimit(
             x: px + w,
             y: py + h + 5 * scale,
             size: fontSize,
-            color: COLORS['black'],
+            color: BLACK,
         });
     }
 }
 
-function drawConnection(
-    page: PDFPage,
-    routed: RoutedConnection,
-    bounds: ContentBounds,
-    pageHeight: number,
-    scale: number,
-    offsetX: number,
-    offsetY: number,
-): void {
-    const { conn, points } = routed;
-    if (points.length < 2) return;
-
-    // Transform points to PDF space
-    const pdfPts: Point[] = points.map(([x, y]) => [
-        toPdfX(x, bounds, scale, offsetX),
-        toPdfY(y, bounds, pageHeight, scale, offsetY),
-    ]);
-
-    let color = COLORS['flow'];
-    let dash: number[] | undefined;
-    let thickness = STROKE_WIDTH;
-
-    if (conn.isCrossSystem) {
-        color = COLORS['crossSystem'];
-        dash = [8, 4];
-    } else if (conn.isUsage) {
-        color = COLORS['usage'];
-        dash = [6, 4];
-    }
+function connectionStyleKey(routed: RoutedConnection): ConnectionStyleKey {
+    if (routed.conn.isCrossSystem) return 'crossSystem';
+    if (routed.conn.isUsage) return 'usage';
+    return 'flow';
+}
 
-    drawPolyline(page, pdfPts, color, thickness, dash);
+/** Draw routed connections; converts their points to PDF space in place. */
+function drawConnections(page: PDFPage, routed: RoutedConnection[], t: PdfTransform): void {
+    // Bucket connections by stroke style so each style is emitted as one path
+    const buckets: Record<ConnectionStyleKey, Point[][]> = {
+        flow: [],
+        usage: [],
+        crossSystem: [],
+    };
+    const arrowheads: Record<ConnectionStyleKey, string[]> = {
+        flow: [],
+        usage: [],
+        crossSystem: [],
+    };
 
-    // Arrowhead at last segment
-    const tip = pdfPts[pdfPts.length - 1];
-    const prev = pdfPts[pdfPts.length - 2];
-    drawArrowhead(page, tip, prev, color);
+    for (const r of routed) {
+        if (r.points.length < 2) continue;
+
+        // Transform points to PDF space in place; the routing result is
+        // private to this export, so there is no need to copy it
+        const pdfPts = r.points;
+        for (const p of pdfPts) {
+            p[0] = toPdfX(p[0], t);
+            p[1] = toPdfY(p[1], t);
+        }
+        const key = connectionStyleKey(r);
+        buckets[key].push(pdfPts);
 
-    // Usage gets arrowhead at start too
-    if (conn.isUsage && pdfPts.length >= 2) {
-        drawArrowhead(page, pdfPts[0], pdfPts[1], color);
+        // Arrowhead at last segment
+        const tipPath = arrowheadPath(pdfPts[pdfPts.length - 1], pdfPts[pdfPts.length - 2]);
+        if (tipPath) arrowheads[key].push(tipPath);
+
+        // Usage gets arrowhead at start too
+        if (r.conn.isUsage) {
+            const startPath = arrowheadPath(pdfPts[0], pdfPts[1]);
+            if (startPath) arrowheads[key].push(startPath);
+        }
+    }
+
+    const keys = Object.keys(buckets) as ConnectionStyleKey[];
+    for (const key of keys) {
+        strokePolylines(page, buckets[key], CONNECTION_STYLES[key], STROKE_WIDTH);
+    }
+    for (const key of keys) {
+        drawArrowheads(page, arrowheads[key], CONNECTION_STYLES[key].color);
     }
 }
 
@@ -470,6 +508,7 @@ export async function exportPdf(diagram: DiagramLayout, options?: PdfOptions): P
     if (author) pdfDoc.setAuthor(author);
 
     const page = pdfDoc.addPage([pageWidth, pageHeight]);
+    const transform = createTransform(bounds, pageHeight, scale, offsetX, offsetY);
 
     // White background
     page.drawRectangle({
@@ -482,22 +521,20 @@ export async function exportPdf(diagram: DiagramLayout, options?: PdfOptions): P
 
     // System limits
     for (const sl of systemLimits) {
-        drawSystemLimit(page, sl, bounds, pageHeight, scale, offsetX, offsetY);
+        drawSystemLimit(page, sl, transform);
     }
 
     // Connections
-    for (const r of routed) {
-        drawConnection(page, r, bounds, pageHeight, scale, offsetX, offsetY);
-    }
+    drawConnections(page, routed, transform);
 
     // Elements
     for (const el of elements) {
         if (el.type === 'state') {
-            drawState(page, el, bounds, pageHeight, scale, offsetX, offsetY);
+            drawState(page, el, transform);
         } else if (el.type === 'processOperator') {
-            drawProcessOperator(page, el, bounds, pageHeight, scale, offsetX, offsetY);
+            drawProcessOperator(page, el, transform);
         } else if (el.type === 'technicalResource') {
-            drawTechnicalResource(page, el, bounds, pageHeight, scale, offsetX, offsetY);
+            drawTechnicalResource(page, el, transform);
         }
     }
 
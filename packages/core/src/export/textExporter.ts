@@ -1,22 +1,36 @@
 /** Text exporter that converts ProcessModel back to FPD text syntax. */
 
-import { StateType } from '../models/fpdModel';
+import {
+    Flow,
+    FlowType,
+    ProcessOperator,
+    State,
+    StateType,
+    TechnicalResource,
+    Usage,
+} from '../models/fpdModel';
 import { ProcessModel } from '../models/processModel';
 
-const FLOW_TYPE_OPERATORS: Record<string, string> = {
+const FLOW_TYPE_OPERATORS: Readonly<Record<FlowType, string>> = {
     flow: '-->',
     alternativeFlow: '-.->',
     parallelFlow: '==>',
 };
 
-const STATE_TYPE_KEYWORDS: Record<string, string> = {
-    product: 'product',
-    energy: 'energy',
-    information: 'information',
-};
+/** State types in export order, paired with their declaration keyword. */
+const STATE_TYPE_KEYWORDS: ReadonlyArray<readonly [StateType, string]> = [
+    ['product', 'product'],
+    ['energy', 'energy'],
+    ['information', 'information'],
+];
+
+const LABEL_ESCAPE_TEST = /[\\"]/;
+const LABEL_ESCAPE_RE = /[\\"]/g;
 
 function escapeLabel(label: string): string {
-    return label.replace(/\\/g, '\\\\').replace(/"/g, '\\"');
+    // Most labels need no escaping; skip the replace allocation for them
+    if (!LABEL_ESCAPE_TEST.test(label)) return label;
+    return label.replace(LABEL_ESCAPE_RE, '\\$&');
 }
 
 function exportStateLine(
@@ -31,38 +45,76 @@ function exportStateLine(
     return line;
 }
 
-function exportElementsForSystem(
-    model: ProcessModel,
-    systemId: string | undefined,
-    indent: string,
-): string[] {
+/** Elements of a single system block, in declaration order. */
+interface SystemElements {
+    /** Keyed by the exported state types only; other types have no bucket. */
+    states: Map<StateType, State[]>;
+    processOperators: ProcessOperator[];
+    technicalResources: TechnicalResource[];
+    flows: Flow[];
+    usages: Usage[];
+}
+
+/** Bucket all model elements by systemId (and states by type) in a single pass over each list. */
+function groupBySystem(model: ProcessModel): Map<string | undefined, SystemElements> {
+    const groups = new Map<string | undefined, SystemElements>();
+    const groupFor = (systemId: string | undefined): SystemElements => {
+        let group = groups.get(systemId);
+        if (!group) {
+            group = {
+                states: new Map<StateType, State[]>(
+                    STATE_TYPE_KEYWORDS.map(([stateType]) => [stateType, []]),
+                ),
+                processOperators: [],
+                technicalResources: [],
+                flows: [],
+                usages: [],
+            };
+            groups.set(systemId, group);
+        }
+        return group;
+    };
+
+    for (const state of model.states) {
+        // Unknown state types have no keyword and are not exported
+        groupFor(state.systemId).states.get(state.stateType)?.push(state);
+    }
+    for (const po of model.processOperators) groupFor(po.systemId).processOperators.push(po);
+    for (const tr of model.technicalResources) groupFor(tr.systemId).technicalResources.push(tr);
+    for (const flow of model.flows) groupFor(flow.systemId).flows.push(flow);
+    for (const usage of model.usages) groupFor(usage.systemId).usages.push(usage);
+
+    return groups;
+}
+
+function exportFlowLine(flow: Flow, indent: string): string {
+    const operator = FLOW_TYPE_OPERATORS[flow.flowType || 'flow'] || '-->';
+    return `${indent}${flow.sourceRef} ${operator} ${flow.targetRef}`;
+}
+
+function exportElementsForSystem(group: SystemElements | undefined, indent: string): string[] {
     const lines: string[] = [];
+    if (!group) {
+        return lines;
+    }
 
     // States grouped by type
-    const stateTypes: StateType[] = ['product', 'energy', 'information'];
-    for (const stateType of stateTypes) {
-        const keyword = STATE_TYPE_KEYWORDS[stateType];
-        for (const state of model.states) {
-            if (state.stateType === stateType && state.systemId === systemId) {
-                lines.push(indent + exportStateLine(state, keyword));
-            }
+    for (const [stateType, keyword] of STATE_TYPE_KEYWORDS) {
+        for (const state of group.states.get(stateType)!) {
+            lines.push(indent + exportStateLine(state, keyword));
         }
     }
 
     // Process operators
-    for (const po of model.processOperators) {
-        if (po.systemId === systemId) {
-            const label = po.label || po.id;
-            lines.push(`${indent}process_operator ${po.id} "${escapeLabel(label)}"`);
-        }
+    for (const po of group.processOperators) {
+        const label = po.label || po.id;
+        lines.push(`${indent}process_operator ${po.id} "${escapeLabel(label)}"`);
     }
 
     // Technical resources
-    for (const tr of model.technicalResources) {
-        if (tr.systemId === systemId) {
-            const label = tr.label || tr.id;
-            lines.push(`${indent}technical_resource ${tr.id} "${escapeLabel(label)}"`);
-        }
+    for (const tr of group.technicalResources) {
+        const label = tr.label || tr.id;
+        lines.push(`${indent}technical_resource ${tr.id} "${escapeLabel(label)}"`);
     }
 
     if (lines.length > 0) {
@@ -70,19 +122,13 @@ function exportElementsForSystem(
     }
 
     // Flows
-    for (const flow of model.flows) {
-        if (flow.systemId === systemId) {
-            const flowType = flow.flowType || 'flow';
-            const operator = FLOW_TYPE_OPERATORS[flowType] || '-->';
-            lines.push(`${indent}${flow.sourceRef} ${operator} ${flow.targetRef}`);
-        }
+    for (const flow of group.flows) {
+        lines.push(exportFlowLine(flow, indent));
     }
 
     // Usages
-    for (const usage of model.usages) {
-        if (usage.systemId === systemId) {
-            lines.push(`${indent}${usage.processOperatorRef} <..> ${usage.technicalResourceRef}`);
-        }
+    for (const usage of group.usages) {
+        lines.push(`${indent}${usage.processOperatorRef} <..> ${usage.technicalResourceRef}`);
     }
 
     return lines;
@@ -98,29 +144,29 @@ export function exportText(model: ProcessModel): string {
 
     lines.push('');
 
+    const groups = groupBySystem(model);
+
     if (model.systemLimits.length > 0) {
         // Multi-system export: wrap elements in system blocks
         for (const sl of model.systemLimits) {
             lines.push(`system "${escapeLabel(sl.label)}" {`);
-            const systemLines = exportElementsForSystem(model, sl.id, '  ');
+            const systemLines = exportElementsForSystem(groups.get(sl.id), '  ');
             lines.push(...systemLines);
             lines.push('}');
             lines.push('');
         }
 
         // Cross-system connections (flows with systemId undefined)
-        const crossFlows = model.flows.filter((f) => f.systemId === undefined);
+        const crossFlows = groups.get(undefined)?.flows ?? [];
         if (crossFlows.length > 0) {
             for (const flow of crossFlows) {
-                const flowType = flow.flowType || 'flow';
-                const operator = FLOW_TYPE_OPERATORS[flowType] || '-->';
-                lines.push(`${flow.sourceRef} ${operator} ${flow.targetRef}`);
+                lines.push(exportFlowLine(flow, ''));
             }
             lines.push('');
         }
     } else {
         // Flat export (no systems)
-        const flatLines = exportElementsForSystem(model, undefined, '');
+        const flatLines = exportElementsForSystem(groups.get(undefined), '');
         lines.push(...flatLines);
         lines.push('');
     }
@@ -24,69 +24,112 @@ function fpbTag(localName: string): string {
     return `${FPB_PREFIX}:${localName}`;
 }
 
-function identificationXml(
-    indent: string,
+/** Indentation and line separator for one output style. */
+interface XmlLayout {
+    /** Indentation prefix per nesting depth (index = depth). */
+    indent: readonly string[];
+    /** String placed between emitted lines. */
+    separator: string;
+    /** Empty characteristics/assignments children shared by every state, PO and TR. */
+    emptyChildren: readonly string[];
+}
+
+/** Deepest nesting level the exporter emits (flow entry/exit bindings). */
+const MAX_DEPTH = 6;
+
+function xmlLayout(indentUnit: string, separator: string): XmlLayout {
+    const indent = Array.from({ length: MAX_DEPTH + 1 }, (_, depth) => indentUnit.repeat(depth));
+    const emptyChildren = ['characteristics', 'assignments'].map(
+        (name) => `${indent[4]}<${fpbTag(name)}/>`,
+    );
+    return { indent, separator, emptyChildren };
+}
+
+const PRETTY_LAYOUT = xmlLayout('  ', '\n');
+/** Every line holds whole tags, so dropping indentation and breaks keeps the content. */
+const COMPACT_LAYOUT = xmlLayout('', '');
+
+function appendIdentification(
+    lines: string[],
+    layout: XmlLayout,
+    depth: number,
     uniqueIdent: string,
     longName?: string | null,
     shortName?: string | null,
-): string {
-    const attrs: string[] = [`uniqueIdent="${escapeXml(uniqueIdent)}"`];
+): void {
+    const indent = layout.indent[depth];
+    let attrs = `uniqueIdent="${escapeXml(uniqueIdent)}"`;
     if (longName) {
-        attrs.push(`longName="${escapeXml(longName)}"`);
+        attrs += ` longName="${escapeXml(longName)}"`;
     }
     if (shortName) {
-        attrs.push(`shortName="${escapeXml(shortName)}"`);
+        attrs += ` shortName="${escapeXml(shortName)}"`;
     }
-    const lines: string[] = [];
-    lines.push(`${indent}<${fpbTag('identification')} ${attrs.join(' ')}>`);
-    lines.push(`${indent}  <${fpbTag('references')}/>`);
-    lines.push(`${indent}</${fpbTag('identification')}>`);
-    return lines.join('\n');
-}
-
-function emptyChildrenXml(indent: string, ...names: string[]): string {
-    return names.map((name) => `${indent}<${fpbTag(name)}/>`).join('\n');
+    lines.push(
+        `${indent}<${fpbTag('identification')} ${attrs}>`,
+        `${layout.indent[depth + 1]}<${fpbTag('references')}/>`,
+        `${indent}</${fpbTag('identification')}>`,
+    );
 }
 
-function flowsElementXml(
-    indent: string,
+function appendFlowsElement(
+    lines: string[],
+    layout: XmlLayout,
+    depth: number,
     elementId: string,
     flowsAsSource: Flow[],
     flowsAsTarget: Flow[],
-): string {
-    const lines: string[] = [];
+): void {
+    const indent = layout.indent[depth];
+    const flowIndent = layout.indent[depth + 1];
+    const bindingIndent = layout.indent[depth + 2];
+    const eid = escapeXml(elementId);
     lines.push(`${indent}<${fpbTag('flows')}>`);
     for (const flow of flowsAsSource) {
-        lines.push(`${indent}  <${fpbTag('flow')} id="${escapeXml(flow.id)}">`);
-        lines.push(`${indent}    <${fpbTag('exit')} id="${escapeXml(elementId)}"/>`);
-        lines.push(`${indent}  </${fpbTag('flow')}>`);
+        lines.push(
+            `${flowIndent}<${fpbTag('flow')} id="${escapeXml(flow.id)}">`,
+            `${bindingIndent}<${fpbTag('exit')} id="${eid}"/>`,
+            `${flowIndent}</${fpbTag('flow')}>`,
+        );
     }
     for (const flow of flowsAsTarget) {
-        lines.push(`${indent}  <${fpbTag('flow')} id="${escapeXml(flow.id)}">`);
-        lines.push(`${indent}    <${fpbTag('entry')} id="${escapeXml(elementId)}"/>`);
-        lines.push(`${indent}  </${fpbTag('flow')}>`);
+        lines.push(
+            `${flowIndent}<${fpbTag('flow')} id="${escapeXml(flow.id)}">`,
+            `${bindingIndent}<${fpbTag('entry')} id="${eid}"/>`,
+            `${flowIndent}</${fpbTag('flow')}>`,
+        );
     }
     lines.push(`${indent}</${fpbTag('flows')}>`);
-    return lines.join('\n');
 }
 
-function usagesElementXml(indent: string, usagesList: Usage[]): string {
-    const lines: string[] = [];
+function appendUsagesElement(
+    lines: string[],
+    layout: XmlLayout,
+    depth: number,
+    usagesList: Usage[],
+): void {
+    const indent = layout.indent[depth];
+    const usageIndent = layout.indent[depth + 1];
     lines.push(`${indent}<${fpbTag('usages')}>`);
     for (const usage of usagesList) {
-        lines.push(`${indent}  <${fpbTag('usage')} id="${escapeXml(usage.id)}"/>`);
+        lines.push(`${usageIndent}<${fpbTag('usage')} id="${escapeXml(usage.id)}"/>`);
     }
     lines.push(`${indent}</${fpbTag('usages')}>`);
-    return lines.join('\n');
+}
+
+export interface XmlExportOptions {
+    /** Indent nested elements, one per line (default: true). */
+    pretty?: boolean;
 }
 
 /**
  * Convert a ProcessModel to HSU FPD_Schema.xsd-compatible XML.
  *
  * @param model - The process model to export.
+ * @param options - Serialization options; pass `pretty: false` for compact output.
  * @returns A string containing VDI 3682 XML compatible with the HSU schema.
  */
-export function exportXml(model: ProcessModel): string {
+export function exportXml(model: ProcessModel, options?: XmlExportOptions): string {
     // --- Build lookup indices ---
     const sourceFlows: Record<string, Flow[]> = {};
     const targetFlows: Record<string, Flow[]> = {};
@@ -114,6 +157,8 @@ export function exportXml(model: ProcessModel): string {
         trUsages[usage.technicalResourceRef].push(usage);
     }
 
+    const layout = options?.pretty === false ? COMPACT_LAYOUT : PRETTY_LAYOUT;
+    const [, i1, i2, i3] = layout.indent;
     const lines: string[] = [];
 
     // --- XML declaration ---
@@ -125,102 +170,107 @@ export function exportXml(model: ProcessModel): string {
     );
 
     // --- Project information ---
-    lines.push(`  <${fpbTag('projectInformation')} entryPoint="process_1"/>`);
+    lines.push(`${i1}<${fpbTag('projectInformation')} entryPoint="process_1"/>`);
 
     // --- Process ---
-    lines.push(`  <${fpbTag('process')} id="process_1">`);
+    lines.push(`${i1}<${fpbTag('process')} id="process_1">`);
 
     // --- SystemLimit (HSU: direct @id/@name) ---
     if (model.systemLimits.length > 0) {
         const sl = model.systemLimits[0];
         const slId = escapeXml(sl.identification.uniqueIdent);
         const slName = escapeXml(sl.label || model.title || 'System Boundary');
-        lines.push(`    <${fpbTag('systemLimit')} id="${slId}" name="${slName}"/>`);
+        lines.push(`${i2}<${fpbTag('systemLimit')} id="${slId}" name="${slName}"/>`);
     } else {
         const slName = escapeXml(model.title || 'System Boundary');
-        lines.push(`    <${fpbTag('systemLimit')} id="sl_1" name="${slName}"/>`);
+        lines.push(`${i2}<${fpbTag('systemLimit')} id="sl_1" name="${slName}"/>`);
     }
 
     // --- States ---
-    lines.push(`    <${fpbTag('states')}>`);
+    lines.push(`${i2}<${fpbTag('states')}>`);
     for (const state of model.states) {
         const stateType = STATE_TYPE_MAP[state.stateType] || 'product';
-        lines.push(`      <${fpbTag('state')} stateType="${stateType}">`);
-        lines.push(
-            identificationXml(
-                '        ',
-                state.identification.uniqueIdent,
-                state.label || null,
-                state.identification.shortName,
-            ),
+        lines.push(`${i3}<${fpbTag('state')} stateType="${stateType}">`);
+        appendIdentification(
+            lines,
+            layout,
+            4,
+            state.identification.uniqueIdent,
+            state.label || null,
+            state.identification.shortName,
         );
-        lines.push(emptyChildrenXml('        ', 'characteristics', 'assignments'));
-        lines.push(
-            flowsElementXml(
-                '        ',
-                state.id,
-                sourceFlows[state.id] || [],
-                targetFlows[state.id] || [],
-            ),
+        lines.push(...layout.emptyChildren);
+        appendFlowsElement(
+            lines,
+            layout,
+            4,
+            state.id,
+            sourceFlows[state.id] || [],
+            targetFlows[state.id] || [],
         );
-        lines.push(`      </${fpbTag('state')}>`);
+        lines.push(`${i3}</${fpbTag('state')}>`);
     }
-    lines.push(`    </${fpbTag('states')}>`);
+    lines.push(`${i2}</${fpbTag('states')}>`);
 
     // --- ProcessOperators ---
-    lines.push(`    <${fpbTag('processOperators')}>`);
+    lines.push(`${i2}<${fpbTag('processOperators')}>`);
     for (const po of model.processOperators) {
-        lines.push(`      <${fpbTag('processOperator')}>`);
-        lines.push(
-            identificationXml(
-                '        ',
-                po.identification.uniqueIdent,
-                po.label || null,
-                po.identification.shortName,
-            ),
+        lines.push(`${i3}<${fpbTag('processOperator')}>`);
+        appendIdentification(
+            lines,
+            layout,
+            4,
+            po.identification.uniqueIdent,
+            po.label || null,
+            po.identification.shortName,
         );
-        lines.push(emptyChildrenXml('        ', 'characteristics', 'assignments'));
-        lines.push(
-            flowsElementXml('        ', po.id, sourceFlows[po.id] || [], targetFlows[po.id] || []),
+        lines.push(...layout.emptyChildren);
+        appendFlowsElement(
+            lines,
+            layout,
+            4,
+            po.id,
+            sourceFlows[po.id] || [],
+            targetFlows[po.id] || [],
         );
-        lines.push(usagesElementXml('        ', poUsages[po.id] || []));
-        lines.push(`      </${fpbTag('processOperator')}>`);
+        appendUsagesElement(lines, layout, 4, poUsages[po.id] || []);
+        lines.push(`${i3}</${fpbTag('processOperator')}>`);
     }
-    lines.push(`    </${fpbTag('processOperators')}>`);
+    lines.push(`${i2}</${fpbTag('processOperators')}>`);
 
     // --- TechnicalResources ---
-    lines.push(`    <${fpbTag('technicalResources')}>`);
+    lines.push(`${i2}<${fpbTag('technicalResources')}>`);
     for (const tr of model.technicalResources) {
-        lines.push(`      <${fpbTag('technicalResource')}>`);
-        lines.push(
-            identificationXml(
-                '        ',
-                tr.identification.uniqueIdent,
-                tr.label || null,
-                tr.identification.shortName,
-            ),
+        lines.push(`${i3}<${fpbTag('technicalResource')}>`);
+        appendIdentification(
+            lines,
+            layout,
+            4,
+            tr.identification.uniqueIdent,
+            tr.label || null,
+            tr.identification.shortName,
         );
-        lines.push(emptyChildrenXml('        ', 'characteristics', 'assignments'));
-        lines.push(usagesElementXml('        ', trUsages[tr.id] || []));
-        lines.push(`      </${fpbTag('technicalResource')}>`);
+        lines.push(...layout.emptyChildren);
+        appendUsagesElement(lines, layout, 4, trUsages[tr.id] || []);
+        lines.push(`${i3}</${fpbTag('technicalResource')}>`);
     }
-    lines.push(`    </${fpbTag('technicalResources')}>`);
+    lines.push(`${i2}</${fpbTag('technicalResources')}>`);
 
     // --- FlowContainer (registry only — no sourceRef/targetRef) ---
-    lines.push(`    <${fpbTag('flowContainer')}>`);
+    lines.push(`${i2}<${fpbTag('flowContainer')}>`);
     for (const flow of model.flows) {
         const flowType = FLOW_TYPE_MAP[flow.flowType] || 'flow';
-        lines.push(`      <${fpbTag('flow')} id="${escapeXml(flow.id)}" flowType="${flowType}"/>`);
+        lines.push(`${i3}<${fpbTag('flow')} id="${escapeXml(flow.id)}" flowType="${flowType}"/>`);
     }
     for (const usage of model.usages) {
-        lines.push(`      <${fpbTag('flow')} id="${escapeXml(usage.id)}" flowType="usage"/>`);
+        lines.push(`${i3}<${fpbTag('flow')} id="${escapeXml(usage.id)}" flowType="usage"/>`);
     }
-    lines.push(`    </${fpbTag('flowContainer')}>`);
+    lines.push(`${i2}</${fpbTag('flowContainer')}>`);
 
     // --- Close process and root ---
-    lines.push(`  </${fpbTag('process')}>`);
+    lines.push(`${i1}</${fpbTag('process')}>`);
     lines.push(`</${fpbTag('project')}>`);
     lines.push('');
 
-    return lines.join('\n');
+    return lines.join(layout.separator);
 }
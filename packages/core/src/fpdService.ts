@@ -6,7 +6,7 @@ import { validateConnections } from './parser/validator';
 import { computeLayout, DiagramLayout } from './services/layout';
 import { renderSvg } from './services/svgRenderer';
 import { exportText } from './export/textExporter';
-import { exportXml } from './export/xmlExporter';
+import { exportXml, XmlExportOptions } from './export/xmlExporter';
 import { exportPdf, PdfOptions } from './export/pdfExporter';
 import { detectFormat, importXml } from './import/xmlImporter';
 
@@ -15,7 +15,13 @@ export interface ParseResult {
     diagram: DiagramLayout;
 }
 
+/** Number of recent sources whose parse results parseShared() and the render/export methods reuse. */
+const SHARED_CACHE_SIZE = 8;
+
 export class FpdService {
+    /** Recently parsed sources for read-only consumers, oldest first. */
+    private sharedCache = new Map<string, ParseResult>();
+
     /** Parse FPD source text into a model and diagram layout. */
     parse(source: string): ParseResult {
         const parser = new FpdParser(source);
@@ -30,9 +36,35 @@ export class FpdService {
         return { model, diagram };
     }
 
+    /**
+     * Like parse(), but reuses the result for recently seen sources.
+     *
+     * Resubmitting an unchanged source (editor autosaves, exporting one
+     * diagram in several formats) then skips parsing and layout. The result
+     * may be shared with other callers and must not be mutated; parse() never
+     * returns a cached result.
+     */
+    parseShared(source: string): Readonly<ParseResult> {
+        const cached = this.sharedCache.get(source);
+        if (cached) {
+            // Move to the most recently used position
+            this.sharedCache.delete(source);
+            this.sharedCache.set(source, cached);
+            return cached;
+        }
+
+        const result = this.parse(source);
+        this.sharedCache.set(source, result);
+        if (this.sharedCache.size > SHARED_CACHE_SIZE) {
+            const oldest = this.sharedCache.keys().next().value as string;
+            this.sharedCache.delete(oldest);
+        }
+        return result;
+    }
+
     /** Render FPD source text to an SVG string. */
     renderSvg(source: string): string {
-        const { diagram } = this.parse(source);
+        const { diagram } = this.parseShared(source);
         return renderSvg(diagram);
     }
 
@@ -43,19 +75,19 @@ export class FpdService {
 
     /** Export FPD source text to PDF format. */
     async exportPdf(source: string, options?: PdfOptions): Promise<Uint8Array> {
-        const { model, diagram } = this.parse(source);
+        const { model, diagram } = this.parseShared(source);
         return exportPdf(diagram, { title: model.title, ...options });
     }
 
     /** Export FPD source text to VDI 3682 XML. */
-    exportXml(source: string): string {
-        const { model } = this.parse(source);
-        return exportXml(model);
+    exportXml(source: string, options?: XmlExportOptions): string {
+        const { model } = this.parseShared(source);
+        return exportXml(model, options);
     }
 
     /** Export (reformat) FPD source text. */
     exportText(source: string): string {
-        const { model } = this.parse(source);
+        const { model } = this.parseShared(source);
         return exportText(model);
     }
 
@@ -241,4 +241,74 @@ describe('importXml error handling', () => {
         expect(result.model.states).toHaveLength(0);
         expect(result.model.processOperators).toHaveLength(0);
     });
+
+    it('falls back to default types for unknown type attributes', () => {
+        const xml = [
+            '<fpb:project xmlns:fpb="http://www.vdivde.de/3682">',
+            '  <fpb:states><fpb:state stateType="constructor">',
+            '    <fpb:identification uniqueIdent="s1"/>',
+            '  </fpb:state></fpb:states>',
+            '  <fpb:flowContainer><fpb:flow id="f1" flowType="toString">',
+            '    <fpb:sourceRef>s1</fpb:sourceRef><fpb:targetRef>po1</fpb:targetRef>',
+            '  </fpb:flow></fpb:flowContainer>',
+            '</fpb:project>',
+        ].join('\n');
+        const { model } = importXml(xml);
+        expect(model.states[0].stateType).toBe('product');
+        expect(model.flows[0].flowType).toBe('flow');
+    });
+
+    it('rejects excessively nested XML', () => {
+        const xml = '<a>'.repeat(1000) + '</a>'.repeat(1000);
+        expect(() => importXml(xml)).toThrow(/Invalid XML: elements nested deeper/);
+    });
+
+    it('reads flow references from legacy XML with comments between elements', () => {
+        const xml = [
+            '<?xml version="1.0"?>',
+            '<!-- exported -->',
+            '<fpb:project xmlns:fpb="http://www.vdivde.de/3682">',
+            '  <fpb:flowContainer>',
+            '    <fpb:flow id="f1" flowType="flow">',
+            '      <fpb:sourceRef> s1 </fpb:sourceRef>',
+            '      <!-- target --><fpb:targetRef>po1</fpb:targetRef>',
+            '    </fpb:flow>',
+            '  </fpb:flowContainer>',
+            '</fpb:project>',
+        ].join('\n');
+        const { model } = importXml(xml);
+        expect(model.flows).toHaveLength(1);
+        expect(model.flows[0].sourceRef).toBe('s1');
+        expect(model.flows[0].targetRef).toBe('po1');
+    });
+
+    it('imports nothing from a document missing its closing tags', () => {
+        const xml = modelToXml((m) => {
+            m.states.push(makeState('s1'));
+            m.processOperators.push(makePO('po1'));
+            m.flows.push(makeFlow('s1', 'po1'));
+        });
+        const truncated = xml.slice(0, xml.lastIndexOf('</'));
+        const { model } = importXml(truncated);
+        expect(model.states).toHaveLength(0);
+        expect(model.processOperators).toHaveLength(0);
+        expect(model.flows).toHaveLength(0);
+    });
+
+    it('drops the content of an element that is never closed', () => {
+        const xml = [
+            '<fpb:project xmlns:fpb="http://www.vdivde.de/3682">',
+            '  <fpb:flowContainer>',
+            '    <fpb:flow id="f1" flowType="flow">',
+            '      <fpb:sourceRef>s1</fpb:sourceRef>',
+            '      <fpb:targetRef>po1',
+            '    </fpb:flow>',
+            '  </fpb:flowContainer>',
+            '</fpb:project>',
+        ].join('\n');
+        const { model } = importXml(xml);
+        expect(model.flows).toHaveLength(1);
+        expect(model.flows[0].sourceRef).toBe('s1');
+        expect(model.flows[0].targetRef).toBe('');
+    });
 });
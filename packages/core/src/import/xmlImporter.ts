@@ -5,8 +5,7 @@
  * Uses a minimal regex-based XML parser to avoid external dependencies.
  */
 
-import type { FlowType, StateType } from '../models/fpdModel';
-import { STATE_TYPE_MAP, FLOW_TYPE_MAP } from '../models/constants';
+import type { FlowType, Identification, StateType } from '../models/fpdModel';
 import { ProcessModel, createProcessModel } from '../models/processModel';
 import { exportText } from '../export/textExporter';
 
@@ -22,6 +21,26 @@ interface XmlElement {
     text: string; // direct text content
 }
 
+/** One attribute: name="value" or name='value'. */
+const ATTR_RE = /([a-zA-Z_][\w:.-]*)\s*=\s*(?:"([^"]*)"|'([^']*)')/g;
+
+/**
+ * Opening tag: <tagname attrs...> or <tagname attrs.../>.
+ * Sticky, so it matches in place at lastIndex without slicing off the rest of the document.
+ */
+const OPEN_TAG_RE =
+    /<([a-zA-Z_][\w:.-]*)((?:\s+[a-zA-Z_][\w:.-]*\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*(\/?)>/y;
+
+/** Closing tag: </tagname>. Sticky, like OPEN_TAG_RE. */
+const CLOSE_TAG_RE = /<\/([a-zA-Z_][\w:.-]*)\s*>/y;
+
+/**
+ * Deepest element nesting accepted on import. VDI 3682 documents are only a
+ * few levels deep; the cap bounds the parser stack and the recursive walks
+ * over the tree for hostile input.
+ */
+const MAX_XML_DEPTH = 64;
+
 /**
  * Strip namespace prefix from a tag name.
  * "fpb:state" -> "state", "state" -> "state"
@@ -37,15 +56,16 @@ function stripNs(tag: string): string {
  */
 function parseAttrs(attrString: string): Record<string, string> {
     const attrs: Record<string, string> = {};
-    const re = /([a-zA-Z_][\w:.-]*)\s*=\s*(?:"([^"]*)"|'([^']*)')/g;
+    ATTR_RE.lastIndex = 0;
     let m: RegExpExecArray | null;
-    while ((m = re.exec(attrString)) !== null) {
+    while ((m = ATTR_RE.exec(attrString)) !== null) {
         attrs[m[1]] = decodeXmlEntities(m[2] ?? m[3]);
     }
     return attrs;
 }
 
 function decodeXmlEntities(s: string): string {
+    if (!s.includes('&')) return s;
     return s
         .replace(/&amp;/g, '&')
         .replace(/&lt;/g, '<')
@@ -55,136 +75,119 @@ function decodeXmlEntities(s: string): string {
 }
 
 /**
- * Very simple recursive-descent XML parser.
+ * Minimal XML parser: one forward scan that keeps the open elements on a stack.
+ *
+ * Each character is visited once, so parsing is linear in the document size.
+ * Scanning stops as soon as the root element is closed.
  *
  * Limitations (acceptable for VDI 3682 XML):
- *   - No CDATA support
- *   - No processing instruction support beyond <?xml ... ?>
- *   - No comment nesting
+ *   - No CDATA or DOCTYPE support (both are skipped)
+ *   - Processing instructions and comments are skipped
+ *   - Entities are decoded in attribute values only
  *   - Namespace prefixes are stripped for matching, but preserved in fullTag
+ *   - A close tag ends every element opened after its match; stray ones are ignored
  */
 function parseXml(xml: string): XmlElement {
-    // Strip XML declaration and comments
-    let s = xml.replace(/<\?xml[^?]*\?>/g, '');
-    s = s.replace(/<!--[\s\S]*?-->/g, '');
-    s = s.trim();
-
-    const elements = parseChildren(s);
-    if (elements.length === 0) {
-        throw new Error('Invalid XML: no root element found');
-    }
-    return elements[0];
-}
-
-/**
- * Parse a string that may contain multiple sibling XML elements
- * and return them as an array.
- */
-function parseChildren(s: string): XmlElement[] {
-    const results: XmlElement[] = [];
+    const stack: XmlElement[] = [];
+    const length = xml.length;
     let pos = 0;
 
-    while (pos < s.length) {
-        // Skip whitespace
-        while (pos < s.length && /\s/.test(s[pos])) pos++;
-        if (pos >= s.length) break;
+    while (pos < length) {
+        const lt = xml.indexOf('<', pos);
+        const textEnd = lt < 0 ? length : lt;
+        if (stack.length > 0 && textEnd > pos) {
+            stack[stack.length - 1].text += xml.substring(pos, textEnd);
+        }
+        if (lt < 0) break;
+        pos = lt;
 
-        if (s[pos] !== '<') {
-            // Text node - skip until next tag
-            pos++;
+        if (xml.startsWith('<!--', pos)) {
+            const commentEnd = xml.indexOf('-->', pos + 4);
+            pos = commentEnd < 0 ? length : commentEnd + 3;
             continue;
         }
-
-        // Skip closing tags at this level (shouldn't happen in well-formed calls)
-        if (s[pos + 1] === '/') break;
-
-        const elem = parseElement(s, pos);
-        if (elem) {
-            results.push(elem.element);
-            pos = elem.endPos;
-        } else {
-            pos++;
+        if (xml.startsWith('<?', pos)) {
+            const piEnd = xml.indexOf('?>', pos + 2);
+            pos = piEnd < 0 ? length : piEnd + 2;
+            continue;
         }
-    }
-
-    return results;
-}
-
-function parseElement(s: string, start: number): { element: XmlElement; endPos: number } | null {
-    // Match opening tag: <tagname attrs...> or <tagname attrs.../>
-    const openTagRe =
-        /^<([a-zA-Z_][\w:.-]*)((?:\s+[a-zA-Z_][\w:.-]*\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*(\/?)>/;
-    const sub = s.substring(start);
-    const m = openTagRe.exec(sub);
-    if (!m) return null;
-
-    const fullTag = m[1];
-    const tag = stripNs(fullTag);
-    const attrs = parseAttrs(m[2]);
-    const selfClosing = m[3] === '/';
-    const afterOpen = start + m[0].length;
-
-    if (selfClosing) {
-        return {
-            element: { tag, fullTag, attrs, children: [], text: '' },
-            endPos: afterOpen,
-        };
-    }
-
-    // Find matching close tag, accounting for nesting of same tag
-    const closeTag = `</${fullTag}>`;
-    let depth = 1;
-    let pos = afterOpen;
-    while (pos < s.length && depth > 0) {
-        const nextOpen = s.indexOf(`<${fullTag}`, pos);
-        const nextClose = s.indexOf(closeTag, pos);
-
-        if (nextClose === -1) {
-            // Malformed XML - just take everything
-            break;
+        if (xml.startsWith('<!', pos)) {
+            const declEnd = xml.indexOf('>', pos + 2);
+            pos = declEnd < 0 ? length : declEnd + 1;
+            continue;
         }
 
-        if (nextOpen !== -1 && nextOpen < nextClose) {
-            // Check if this is actually an opening tag (not a different tag starting with same prefix)
-            const charAfter = s[nextOpen + fullTag.length + 1];
-            if (
-                charAfter === '>' ||
-                charAfter === ' ' ||
-                charAfter === '/' ||
-                charAfter === '\t' ||
-                charAfter === '\n' ||
-                charAfter === '\r'
-            ) {
-                depth++;
+        if (xml[pos + 1] === '/') {
+            CLOSE_TAG_RE.lastIndex = pos;
+            const m = CLOSE_TAG_RE.exec(xml);
+            if (m) {
+                pos = CLOSE_TAG_RE.lastIndex;
+                let open = stack.length - 1;
+                while (open >= 0 && stack[open].fullTag !== m[1]) open--;
+                if (open >= 0) {
+                    while (stack.length > open) {
+                        const closed = stack.pop()!;
+                        if (stack.length === open) {
+                            closed.text = closed.text.trim();
+                        } else {
+                            dropContent(closed);
+                        }
+                        if (stack.length === 0) return closed;
+                    }
+                }
+                continue;
             }
-            pos = nextOpen + 1;
         } else {
-            depth--;
-            if (depth === 0) {
-                const innerContent = s.substring(afterOpen, nextClose);
-                const children = parseChildren(innerContent);
-
-                // Extract direct text content (text not inside child elements)
-                let text = innerContent;
-                // Remove child elements from text to get direct text
-                text = text
-                    .replace(/<[a-zA-Z_][\w:.-]*[\s\S]*?(?:\/>|<\/[a-zA-Z_][\w:.-]*>)/g, '')
-                    .trim();
-
-                return {
-                    element: { tag, fullTag, attrs, children, text },
-                    endPos: nextClose + closeTag.length,
+            OPEN_TAG_RE.lastIndex = pos;
+            const m = OPEN_TAG_RE.exec(xml);
+            if (m) {
+                pos = OPEN_TAG_RE.lastIndex;
+                const element: XmlElement = {
+                    tag: stripNs(m[1]),
+                    fullTag: m[1],
+                    attrs: parseAttrs(m[2]),
+                    children: [],
+                    text: '',
                 };
+                if (stack.length > 0) {
+                    stack[stack.length - 1].children.push(element);
+                }
+                if (m[3] === '/') {
+                    if (stack.length === 0) return element;
+                } else {
+                    if (stack.length >= MAX_XML_DEPTH) {
+                        throw new Error(`elements nested deeper than ${MAX_XML_DEPTH} levels`);
+                    }
+                    stack.push(element);
+                }
+                continue;
             }
-            pos = nextClose + 1;
         }
+
+        // Not markup: keep the '<' as text
+        if (stack.length > 0) {
+            stack[stack.length - 1].text += '<';
+        }
+        pos++;
     }
 
-    // Fallback: malformed
-    return {
-        element: { tag, fullTag, attrs, children: [], text: '' },
-        endPos: s.length,
-    };
+    if (stack.length === 0) {
+        throw new Error('Invalid XML: no root element found');
+    }
+    for (const open of stack) {
+        dropContent(open);
+    }
+    return stack[0];
+}
+
+/**
+ * Empty an element that was never closed. Malformed elements keep their tag
+ * and attributes but no content, so a truncated document imports nothing
+ * from its unfinished part.
+ */
+function dropContent(element: XmlElement): void {
+    element.children = [];
+    element.text = '';
 }
 
 // ---------------------------------------------------------------------------
@@ -195,7 +198,10 @@ function parseElement(s: string, start: number): { element: XmlElement; endPos:
  * Find a direct child element by local tag name.
  */
 function findChild(elem: XmlElement, localTag: string): XmlElement | undefined {
-    return elem.children.find((c) => c.tag === localTag);
+    for (const child of elem.children) {
+        if (child.tag === localTag) return child;
+    }
+    return undefined;
 }
 
 /**
@@ -205,68 +211,166 @@ function findChildren(elem: XmlElement, localTag: string): XmlElement[] {
     return elem.children.filter((c) => c.tag === localTag);
 }
 
+/** Elements of a document (root included) grouped by local tag name, in document order. */
+type TagIndex = ReadonlyMap<string, readonly XmlElement[]>;
+
+const NO_ELEMENTS: readonly XmlElement[] = [];
+
 /**
- * Recursively find all descendant elements matching a local tag name.
+ * Index every element by local tag name in one walk, so each query below is a
+ * lookup rather than another traversal of the whole tree.
  */
-function findAll(elem: XmlElement, localTag: string): XmlElement[] {
-    const results: XmlElement[] = [];
+function indexByTag(root: XmlElement): TagIndex {
+    const index = new Map<string, XmlElement[]>();
     function walk(e: XmlElement): void {
-        if (e.tag === localTag) {
-            results.push(e);
+        const bucket = index.get(e.tag);
+        if (bucket) {
+            bucket.push(e);
+        } else {
+            index.set(e.tag, [e]);
         }
         for (const child of e.children) {
             walk(child);
         }
     }
-    walk(elem);
-    return results;
+    walk(root);
+    return index;
 }
 
-/**
- * Find a descendant via a dot-separated path of local tag names.
- * E.g., findPath(root, 'states.state') finds the first <state> inside <states>.
- */
-function findFirst(elem: XmlElement, localTag: string): XmlElement | undefined {
-    if (elem.tag === localTag) return elem;
-    for (const child of elem.children) {
-        const found = findFirst(child, localTag);
-        if (found) return found;
-    }
-    return undefined;
+/** All elements with the given local tag name, in document order. */
+function findAll(index: TagIndex, localTag: string): readonly XmlElement[] {
+    return index.get(localTag) ?? NO_ELEMENTS;
+}
+
+/** The first element with the given local tag name, in document order. */
+function findFirst(index: TagIndex, localTag: string): XmlElement | undefined {
+    return index.get(localTag)?.[0];
 }
 
 // ---------------------------------------------------------------------------
-// Type maps (imported from shared constants)
+// Type attributes
 // ---------------------------------------------------------------------------
 
+// A switch over the few known values instead of an object lookup: it needs no
+// hashing, and inherited keys such as "constructor" cannot leak through.
+
+/** StateType for a `stateType` attribute; missing or unknown values mean product. */
+function toStateType(value: string | undefined): StateType {
+    switch (value) {
+        case 'energy':
+            return 'energy';
+        case 'information':
+            return 'information';
+        default:
+            return 'product';
+    }
+}
+
+/** FlowType for a `flowType` attribute; missing or unknown values mean a plain flow. */
+function toFlowType(value: string | undefined): FlowType {
+    switch (value) {
+        case 'alternativeFlow':
+            return 'alternativeFlow';
+        case 'parallelFlow':
+            return 'parallelFlow';
+        default:
+            return 'flow';
+    }
+}
+
 // ---------------------------------------------------------------------------
 // Parsing helpers
 // ---------------------------------------------------------------------------
 
-function parseIdentification(elem: XmlElement): {
-    uniqueId: string;
-    longName: string;
-    shortName: string | undefined;
-} {
-    const ident = findChild(elem, 'identification');
-    if (!ident) {
-        return { uniqueId: '', longName: '', shortName: undefined };
+/** Identification whose longName falls back to the uniqueIdent, so it is always set. */
+type ItemIdentification = Identification & { longName: string };
+
+/**
+ * Call `visit` for each `itemTag` child of every `containerTag` element that
+ * carries a uniqueIdent, passing the element and its identification.
+ */
+function forEachItem(
+    index: TagIndex,
+    containerTag: string,
+    itemTag: string,
+    visit: (elem: XmlElement, identification: ItemIdentification) => void,
+): void {
+    for (const container of findAll(index, containerTag)) {
+        for (const elem of container.children) {
+            if (elem.tag !== itemTag) continue;
+            const ident = findChild(elem, 'identification');
+            if (!ident) continue;
+            const attrs = ident.attrs;
+            const uniqueIdent = attrs['uniqueIdent'];
+            if (!uniqueIdent) continue;
+            visit(elem, {
+                uniqueIdent,
+                longName: attrs['longName'] ?? uniqueIdent,
+                shortName: attrs['shortName'],
+            });
+        }
     }
-    const uniqueId = ident.attrs['uniqueIdent'] ?? '';
-    const longName = ident.attrs['longName'] ?? uniqueId;
-    const shortName = ident.attrs['shortName'];
-    return { uniqueId, longName, shortName };
+}
+
+/** Ids of the parsed process operators and technical resources, for resolving usages. */
+interface ElementIds {
+    processOperators: Set<string>;
+    technicalResources: Set<string>;
+}
+
+/**
+ * Parse the states, process operators and technical resources, which both
+ * formats declare the same way, into `model`.
+ */
+function parseElements(
+    index: TagIndex,
+    model: ProcessModel,
+    systemId: string | undefined,
+): ElementIds {
+    const ids: ElementIds = { processOperators: new Set(), technicalResources: new Set() };
+
+    forEachItem(index, 'states', 'state', (elem, identification) => {
+        model.states.push({
+            id: identification.uniqueIdent,
+            stateType: toStateType(elem.attrs['stateType']),
+            identification,
+            label: identification.longName,
+            systemId,
+        });
+    });
+
+    forEachItem(index, 'processOperators', 'processOperator', (_elem, identification) => {
+        ids.processOperators.add(identification.uniqueIdent);
+        model.processOperators.push({
+            id: identification.uniqueIdent,
+            identification,
+            label: identification.longName,
+            systemId,
+        });
+    });
+
+    forEachItem(index, 'technicalResources', 'technicalResource', (_elem, identification) => {
+        ids.technicalResources.add(identification.uniqueIdent);
+        model.technicalResources.push({
+            id: identification.uniqueIdent,
+            identification,
+            label: identification.longName,
+            systemId,
+        });
+    });
+
+    return ids;
 }
 
 // ---------------------------------------------------------------------------
 // Legacy format parser
 // ---------------------------------------------------------------------------
 
-function parseXmlLegacy(root: XmlElement): ProcessModel {
+function parseXmlLegacy(index: TagIndex): ProcessModel {
     const model = createProcessModel();
 
     // Extract title from system limit
-    const systemLimit = findFirst(root, 'systemLimit');
+    const systemLimit = findFirst(index, 'systemLimit');
     if (systemLimit) {
         const ident = findChild(systemLimit, 'identification');
         if (ident) {
@@ -274,58 +378,14 @@ function parseXmlLegacy(root: XmlElement): ProcessModel {
         }
     }
 
-    // Parse states: find all <state> inside <states> containers
-    const statesContainers = findAll(root, 'states');
-    for (const container of statesContainers) {
-        for (const stateElem of findChildren(container, 'state')) {
-            const stateTypeStr = stateElem.attrs['stateType'] ?? 'product';
-            const stateType: StateType = STATE_TYPE_MAP[stateTypeStr] ?? 'product';
-            const { uniqueId, longName, shortName } = parseIdentification(stateElem);
-            if (!uniqueId) continue;
-            model.states.push({
-                id: uniqueId,
-                stateType,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
-
-    // Parse process operators
-    const poContainers = findAll(root, 'processOperators');
-    for (const container of poContainers) {
-        for (const poElem of findChildren(container, 'processOperator')) {
-            const { uniqueId, longName, shortName } = parseIdentification(poElem);
-            if (!uniqueId) continue;
-            model.processOperators.push({
-                id: uniqueId,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
-
-    // Parse technical resources
-    const trContainers = findAll(root, 'technicalResources');
-    for (const container of trContainers) {
-        for (const trElem of findChildren(container, 'technicalResource')) {
-            const { uniqueId, longName, shortName } = parseIdentification(trElem);
-            if (!uniqueId) continue;
-            model.technicalResources.push({
-                id: uniqueId,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
+    parseElements(index, model, undefined);
 
     // Parse flows (legacy: sourceRef/targetRef children)
-    const flowContainers = findAll(root, 'flowContainer');
+    const flowContainers = findAll(index, 'flowContainer');
     for (const container of flowContainers) {
         for (const flowElem of findChildren(container, 'flow')) {
             const flowId = flowElem.attrs['id'] ?? '';
-            const flowTypeStr = flowElem.attrs['flowType'] ?? 'flow';
-            const flowType: FlowType = FLOW_TYPE_MAP[flowTypeStr] ?? 'flow';
+            const flowType = toFlowType(flowElem.attrs['flowType']);
             const sourceRefElem = findChild(flowElem, 'sourceRef');
             const targetRefElem = findChild(flowElem, 'targetRef');
             if (!sourceRefElem || !targetRefElem) continue;
@@ -358,11 +418,11 @@ function parseXmlLegacy(root: XmlElement): ProcessModel {
 // HSU format parser
 // ---------------------------------------------------------------------------
 
-function parseXmlHsu(root: XmlElement): ProcessModel {
+function parseXmlHsu(index: TagIndex): ProcessModel {
     const model = createProcessModel();
 
     // SystemLimit: direct @id/@name attributes (HSU style)
-    const systemLimitElem = findFirst(root, 'systemLimit');
+    const systemLimitElem = findFirst(index, 'systemLimit');
     if (systemLimitElem) {
         let slName = systemLimitElem.attrs['name'];
         const slId = systemLimitElem.attrs['id'] ?? 'sl_1';
@@ -379,54 +439,15 @@ function parseXmlHsu(root: XmlElement): ProcessModel {
         });
     }
 
-    // Parse states
-    const statesContainers = findAll(root, 'states');
-    for (const container of statesContainers) {
-        for (const stateElem of findChildren(container, 'state')) {
-            const stateTypeStr = stateElem.attrs['stateType'] ?? 'product';
-            const stateType: StateType = STATE_TYPE_MAP[stateTypeStr] ?? 'product';
-            const { uniqueId, longName, shortName } = parseIdentification(stateElem);
-            if (!uniqueId) continue;
-            model.states.push({
-                id: uniqueId,
-                stateType,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
+    // Every element belongs to the single HSU system limit (if any); set it at
+    // construction so the text exporter places them inside that system block.
+    const systemId = model.systemLimits.length > 0 ? model.systemLimits[0].id : undefined;
 
-    // Parse process operators
-    const poContainers = findAll(root, 'processOperators');
-    for (const container of poContainers) {
-        for (const poElem of findChildren(container, 'processOperator')) {
-            const { uniqueId, longName, shortName } = parseIdentification(poElem);
-            if (!uniqueId) continue;
-            model.processOperators.push({
-                id: uniqueId,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
-
-    // Parse technical resources
-    const trContainers = findAll(root, 'technicalResources');
-    for (const container of trContainers) {
-        for (const trElem of findChildren(container, 'technicalResource')) {
-            const { uniqueId, longName, shortName } = parseIdentification(trElem);
-            if (!uniqueId) continue;
-            model.technicalResources.push({
-                id: uniqueId,
-                identification: { uniqueIdent: uniqueId, longName, shortName },
-                label: longName,
-            });
-        }
-    }
+    const elementIds = parseElements(index, model, systemId);
 
     // Build flow registry from flowContainer
     const flowRegistry: Record<string, string> = {}; // flow_id -> flowType string
-    const flowContainers = findAll(root, 'flowContainer');
+    const flowContainers = findAll(index, 'flowContainer');
     for (const container of flowContainers) {
         for (const fcFlow of findChildren(container, 'flow')) {
             const fid = fcFlow.attrs['id'] ?? '';
@@ -442,7 +463,7 @@ function parseXmlHsu(root: XmlElement): ProcessModel {
     const flowSources: Record<string, string> = {}; // flow_id -> element_id (exit = source)
     const flowTargets: Record<string, string> = {}; // flow_id -> element_id (entry = target)
 
-    const flowsContainers = findAll(root, 'flows');
+    const flowsContainers = findAll(index, 'flows');
     for (const container of flowsContainers) {
         for (const flowRef of findChildren(container, 'flow')) {
             const fid = flowRef.attrs['id'] ?? '';
@@ -463,8 +484,8 @@ function parseXmlHsu(root: XmlElement): ProcessModel {
     }
 
     // Create Flow and Usage objects from the registry + bindings
-    const poIds = new Set(model.processOperators.map((po) => po.id));
-    const trIds = new Set(model.technicalResources.map((tr) => tr.id));
+    const poIds = elementIds.processOperators;
+    const trIds = elementIds.technicalResources;
 
     for (const [fid, ftypeStr] of Object.entries(flowRegistry)) {
         const src = flowSources[fid] ?? '';
@@ -492,49 +513,57 @@ function parseXmlHsu(root: XmlElement): ProcessModel {
                     id: fid,
                     processOperatorRef: poRef,
                     technicalResourceRef: trRef,
+                    systemId,
                 });
             }
         } else {
-            const flowType: FlowType = FLOW_TYPE_MAP[ftypeStr] ?? 'flow';
+            const flowType = toFlowType(ftypeStr);
             if (src && tgt) {
                 model.flows.push({
                     id: fid,
                     sourceRef: src,
                     targetRef: tgt,
                     flowType,
+                    systemId,
                 });
             }
         }
     }
 
-    // Assign systemId to all elements so the text exporter places them
-    // inside the correct system block.
-    if (model.systemLimits.length > 0) {
-        const slId = model.systemLimits[0].id;
-        for (const state of model.states) {
-            state.systemId = slId;
-        }
-        for (const po of model.processOperators) {
-            po.systemId = slId;
-        }
-        for (const tr of model.technicalResources) {
-            tr.systemId = slId;
-        }
-        for (const flow of model.flows) {
-            flow.systemId = slId;
-        }
-        for (const usage of model.usages) {
-            usage.systemId = slId;
-        }
-    }
-
     return model;
 }
 
+// ---------------------------------------------------------------------------
+// Format detection
+// ---------------------------------------------------------------------------
+
+/**
+ * Legacy documents give flowContainer flows sourceRef children; HSU documents
+ * do not. Stops at the first match without collecting the flows.
+ */
+function isLegacyFormat(index: TagIndex): boolean {
+    return findAll(index, 'flowContainer').some((container) =>
+        container.children.some(
+            (child) => child.tag === 'flow' && findChild(child, 'sourceRef') !== undefined,
+        ),
+    );
+}
+
 // ---------------------------------------------------------------------------
 // Public API
 // ---------------------------------------------------------------------------
 
+/** Formats implied by a (lowercased) filename extension. */
+const EXTENSION_FORMATS: ReadonlyMap<string, 'text' | 'xml'> = new Map([
+    ['.xml', 'xml'],
+    ['.fpd', 'text'],
+    ['.fpb', 'text'],
+    ['.txt', 'text'],
+]);
+
+/** Content whose first non-whitespace character opens a tag. */
+const XML_CONTENT_RE = /^\s*</;
+
 /**
  * Detect file format from filename extension and content.
  *
@@ -542,15 +571,15 @@ function parseXmlHsu(root: XmlElement): ProcessModel {
  * @throws Error if format cannot be determined.
  */
 export function detectFormat(filename: string, content: string): 'text' | 'xml' {
-    const lowerName = filename.toLowerCase();
-    if (lowerName.endsWith('.xml')) return 'xml';
-    if (lowerName.endsWith('.fpd') || lowerName.endsWith('.fpb') || lowerName.endsWith('.txt'))
-        return 'text';
+    const dot = filename.lastIndexOf('.');
+    if (dot >= 0) {
+        const format = EXTENSION_FORMATS.get(filename.substring(dot).toLowerCase());
+        if (format) return format;
+    }
 
-    // Fallback: inspect content
-    const stripped = content.trim();
-    if (stripped.startsWith('<?xml') || stripped.startsWith('<')) return 'xml';
-    if (stripped.includes('@startfpd')) return 'text';
+    // Fallback: inspect content (only its leading whitespace is scanned, no trimmed copy)
+    if (XML_CONTENT_RE.test(content)) return 'xml';
+    if (content.includes('@startfpd')) return 'text';
 
     throw new Error('Unable to detect file format. Use .fpd, .txt, or .xml extension.');
 }
@@ -576,20 +605,9 @@ export function importXml(content: string): {
     // XSD validation is not performed in the VS Code extension (no lxml).
     const xsdWarnings: string[] = [];
 
-    // Detect format: legacy has sourceRef children in flowContainer flows
-    const flowContainers = findAll(root, 'flowContainer');
-    let isLegacy = false;
-    for (const container of flowContainers) {
-        for (const flowElem of findChildren(container, 'flow')) {
-            if (findChild(flowElem, 'sourceRef')) {
-                isLegacy = true;
-                break;
-            }
-        }
-        if (isLegacy) break;
-    }
+    const index = indexByTag(root);
 
-    const model = isLegacy ? parseXmlLegacy(root) : parseXmlHsu(root);
+    const model = isLegacyFormat(index) ? parseXmlLegacy(index) : parseXmlHsu(index);
 
     // Generate FPD text from the imported model
     const source = exportText(model);
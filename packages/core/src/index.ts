@@ -19,7 +19,7 @@ export { createProcessModel } from './models/processModel';
 
 // Parser
 export { TokenType } from './parser/syntax';
-export type { Token } from './parser/lexer';
+export type { Token, LexerOptions } from './parser/lexer';
 export { Lexer, LexerError } from './parser/lexer';
 export { FpdParser, ParseError } from './parser/parser';
 export { validateConnections } from './parser/validator';
@@ -49,6 +49,7 @@ export { renderSvg } from './services/svgRenderer';
 
 // Export
 export { exportXml } from './export/xmlExporter';
+export type { XmlExportOptions } from './export/xmlExporter';
 export { exportText } from './export/textExporter';
 export { exportPdf } from './export/pdfExporter';
 export type { PageSizeOption, OrientationOption, PdfOptions } from './export/pdfExporter';
@@ -85,6 +85,17 @@ describe('Lexer', () => {
         expect(comment!.value).toBe('// this is a comment');
     });
 
+    it('omits comment tokens when skipComments is set', () => {
+        const tokens = new Lexer('a // note\nb', { skipComments: true }).tokenize();
+        expect(tokens.map((t) => t.type)).toEqual([
+            TokenType.IDENTIFIER,
+            TokenType.NEWLINE,
+            TokenType.IDENTIFIER,
+            TokenType.EOF,
+        ]);
+        expect(tokens[2].line).toBe(2);
+    });
+
     it('tokenizes @boundary annotation', () => {
         const tokens = new Lexer('@boundary').tokenize();
         const annToken = tokens.find((t) => t.type === TokenType.ANNOTATION);
@@ -2,7 +2,7 @@
 
 import {
     CONNECTION_OPERATORS,
-    CONNECTION_OPERATORS_SORTED,
+    CONNECTION_OPERATORS_BY_FIRST_CHAR,
     END_DELIMITER,
     KEYWORDS,
     PLACEMENT_ANNOTATIONS,
@@ -10,6 +10,26 @@ import {
     TokenType,
 } from './syntax';
 
+/** Word characters: ASCII alphanumerics, '_' and BMP Unicode letters (see isAlpha). */
+const WORD_RE = /(?:\w|(?=[\u0000-\uFFFF])\p{L})*/uy;
+/** Inline whitespace skipped between tokens. */
+const WHITESPACE_RE = /[ \t\r]*/y;
+/** String literal body: everything up to the closing quote or end of line. */
+const STRING_BODY_RE = /[^"\n]*/y;
+
+/** `@` delimiters, checked before placement annotations. */
+const DELIMITERS: ReadonlyArray<readonly [string, TokenType]> = [
+    [START_DELIMITER, TokenType.START_FPD],
+    [END_DELIMITER, TokenType.END_FPD],
+];
+
+/** Length of the sticky `re` match at `pos` (the patterns above always match). */
+function matchLength(re: RegExp, source: string, pos: number): number {
+    re.lastIndex = pos;
+    re.exec(source);
+    return re.lastIndex - pos;
+}
+
 export interface Token {
     type: TokenType;
     value: string;
@@ -17,6 +37,11 @@ export interface Token {
     column: number;
 }
 
+export interface LexerOptions {
+    /** Consume `//` comments without emitting COMMENT tokens (default: false). */
+    skipComments?: boolean;
+}
+
 export class LexerError extends Error {
     line: number;
     column: number;
@@ -34,19 +59,25 @@ export class Lexer {
     private line = 1;
     private column = 1;
     private tokens: Token[] = [];
+    /** One string instance per distinct word, shared by every token that spells it. */
+    private words = new Map<string, string>();
+    private skipComments: boolean;
 
-    constructor(source: string) {
+    constructor(source: string, options: LexerOptions = {}) {
         this.source = source;
+        this.skipComments = options.skipComments ?? false;
     }
 
     tokenize(): Token[] {
-        while (this.pos < this.source.length) {
+        const source = this.source;
+        const length = source.length;
+        while (this.pos < length) {
             this.skipWhitespace();
-            if (this.pos >= this.source.length) {
+            if (this.pos >= length) {
                 break;
             }
 
-            const ch = this.source[this.pos];
+            const ch = source[this.pos];
 
             if (ch === '\n') {
                 this.emit(TokenType.NEWLINE, '\n');
@@ -54,7 +85,7 @@ export class Lexer {
                 continue;
             }
 
-            if (ch === '/' && this.peek(1) === '/') {
+            if (ch === '/' && source[this.pos + 1] === '/') {
                 this.readComment();
                 continue;
             }
@@ -110,27 +141,21 @@ export class Lexer {
         return ch;
     }
 
-    private peek(offset: number = 0): string | undefined {
-        const idx = this.pos + offset;
-        if (idx < this.source.length) {
-            return this.source[idx];
-        }
-        return undefined;
-    }
-
     private emit(tokenType: TokenType, value: string): void {
         this.tokens.push({ type: tokenType, value, line: this.line, column: this.column });
     }
 
+    /** Emit a token for `value` at the current position and step past it; it spans no newline. */
+    private emitFixed(tokenType: TokenType, value: string): void {
+        this.emit(tokenType, value);
+        this.pos += value.length;
+        this.column += value.length;
+    }
+
     private skipWhitespace(): void {
-        while (this.pos < this.source.length) {
-            const ch = this.source[this.pos];
-            if (ch === ' ' || ch === '\t' || ch === '\r') {
-                this.advance();
-            } else {
-                break;
-            }
-        }
+        const n = matchLength(WHITESPACE_RE, this.source, this.pos);
+        this.pos += n;
+        this.column += n;
     }
 
     private readComment(): void {
@@ -139,9 +164,11 @@ export class Lexer {
         this.pos += 2;
         this.column += 2;
         const start = this.pos;
-        while (this.pos < this.source.length && this.source[this.pos] !== '\n') {
-            this.pos++;
-            this.column++;
+        const newline = this.source.indexOf('\n', start);
+        this.pos = newline < 0 ? this.source.length : newline;
+        this.column += this.pos - start;
+        if (this.skipComments) {
+            return;
         }
         const value = '//' + this.source.substring(start, this.pos);
         this.tokens.push({
@@ -153,30 +180,20 @@ export class Lexer {
     }
 
     private readDelimiter(): void {
-        const delimiters: [string, TokenType][] = [
-            [START_DELIMITER, TokenType.START_FPD],
-            [END_DELIMITER, TokenType.END_FPD],
-        ];
-
-        for (const [delim, ttype] of delimiters) {
-            if (this.source.substring(this.pos, this.pos + delim.length) === delim) {
-                this.emit(ttype, delim);
-                for (let i = 0; i < delim.length; i++) {
-                    this.advance();
-                }
+        const source = this.source;
+        for (const [delim, ttype] of DELIMITERS) {
+            if (source.startsWith(delim, this.pos)) {
+                this.emitFixed(ttype, delim);
                 return;
             }
         }
 
         // Check placement annotations
         for (const annotation of PLACEMENT_ANNOTATIONS) {
-            if (this.source.substring(this.pos, this.pos + annotation.length) === annotation) {
+            if (source.startsWith(annotation, this.pos)) {
                 const endPos = this.pos + annotation.length;
-                if (endPos >= this.source.length || !this.isAlphaNumeric(this.source[endPos])) {
-                    this.emit(TokenType.ANNOTATION, annotation);
-                    for (let i = 0; i < annotation.length; i++) {
-                        this.advance();
-                    }
+                if (endPos >= source.length || !this.isAlphaNumeric(source[endPos])) {
+                    this.emitFixed(TokenType.ANNOTATION, annotation);
                     return;
                 }
             }
@@ -191,14 +208,9 @@ export class Lexer {
         const startLine = this.line;
         this.advance(); // skip opening quote
         const start = this.pos;
-        while (
-            this.pos < this.source.length &&
-            this.source[this.pos] !== '"' &&
-            this.source[this.pos] !== '\n'
-        ) {
-            this.pos++;
-            this.column++;
-        }
+        const n = matchLength(STRING_BODY_RE, this.source, start);
+        this.pos += n;
+        this.column += n;
         const value = this.source.substring(start, this.pos);
         if (this.pos < this.source.length && this.source[this.pos] === '"') {
             this.pos++;
@@ -208,14 +220,13 @@ export class Lexer {
     }
 
     private tryConnectionOperator(): boolean {
-        const remaining = this.source.substring(this.pos);
-        for (const op of CONNECTION_OPERATORS_SORTED) {
-            if (remaining.startsWith(op)) {
-                const tokenType = CONNECTION_OPERATORS.get(op)!;
-                this.emit(tokenType, op);
-                for (let i = 0; i < op.length; i++) {
-                    this.advance();
-                }
+        const candidates = CONNECTION_OPERATORS_BY_FIRST_CHAR.get(this.source[this.pos]);
+        if (!candidates) {
+            return false;
+        }
+        for (const op of candidates) {
+            if (this.source.startsWith(op, this.pos)) {
+                this.emitFixed(CONNECTION_OPERATORS.get(op)!, op);
                 return true;
             }
         }
@@ -226,14 +237,10 @@ export class Lexer {
         const startCol = this.column;
         const startLine = this.line;
         const start = this.pos;
-        while (
-            this.pos < this.source.length &&
-            (this.isAlphaNumeric(this.source[this.pos]) || this.source[this.pos] === '_')
-        ) {
-            this.pos++;
-            this.column++;
-        }
-        const word = this.source.substring(start, this.pos);
+        const n = matchLength(WORD_RE, this.source, start);
+        this.pos += n;
+        this.column += n;
+        const word = this.intern(this.source.substring(start, this.pos));
         if (KEYWORDS.has(word)) {
             this.tokens.push({
                 type: TokenType.KEYWORD,
@@ -251,6 +258,15 @@ export class Lexer {
         }
     }
 
+    private intern(word: string): string {
+        const existing = this.words.get(word);
+        if (existing !== undefined) {
+            return existing;
+        }
+        this.words.set(word, word);
+        return word;
+    }
+
     private isAlpha(ch: string): boolean {
         if ((ch >= 'a' && ch <= 'z') || (ch >= 'A' && ch <= 'Z')) return true;
         // Support Unicode letters (accented chars, CJK, etc.)
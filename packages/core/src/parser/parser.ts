@@ -7,6 +7,7 @@ import {
     ProcessOperator,
     State,
     StatePlacement,
+    StateType,
     SystemLimit,
     TechnicalResource,
     Usage,
@@ -44,6 +45,64 @@ const ANNOTATION_MAP: Record<string, StatePlacement> = {
     '@internal': 'internal',
 };
 
+/** Fields shared by every element declaration, whatever its keyword */
+interface ElementDecl {
+    id: string;
+    identification: Identification;
+    label: string;
+    lineNumber: number;
+    systemId: string | undefined;
+}
+
+interface ElementBuilder {
+    /** Whether placement annotations apply (state keywords only) */
+    acceptsPlacement: boolean;
+    /** Adds a declared element to the model */
+    build(model: ProcessModel, decl: ElementDecl, placement: StatePlacement | undefined): void;
+}
+
+function stateBuilder(stateType: StateType): ElementBuilder {
+    return {
+        acceptsPlacement: true,
+        build(model, decl, placement) {
+            model.states.push({
+                id: decl.id,
+                stateType,
+                identification: decl.identification,
+                label: decl.label,
+                placement,
+                lineNumber: decl.lineNumber,
+                systemId: decl.systemId,
+            } as State);
+        },
+    };
+}
+
+/** One builder per element keyword, so a declaration needs a single lookup */
+const ELEMENT_BUILDERS: ReadonlyMap<string, ElementBuilder> = new Map<string, ElementBuilder>([
+    ...Object.entries(STATE_KEYWORD_MAP).map(
+        ([keyword, stateType]): [string, ElementBuilder] => [keyword, stateBuilder(stateType)],
+    ),
+    [
+        'process_operator',
+        {
+            acceptsPlacement: false,
+            build(model, decl) {
+                model.processOperators.push({ ...decl } as ProcessOperator);
+            },
+        },
+    ],
+    [
+        'technical_resource',
+        {
+            acceptsPlacement: false,
+            build(model, decl) {
+                model.technicalResources.push({ ...decl } as TechnicalResource);
+            },
+        },
+    ],
+]);
+
 export class FpdParser {
     private source: string;
     private tokens: Token[] = [];
@@ -54,13 +113,26 @@ export class FpdParser {
     private usageCounter = 0;
     private currentSystemId: string | null = null;
     private systemCounter = 0;
+    /** Statement handlers keyed by leading keyword, bound once per parser. */
+    private readonly keywordHandlers: ReadonlyMap<string, () => void>;
 
     constructor(source: string) {
         this.source = source;
+
+        const handlers = new Map<string, () => void>([
+            ['title', () => this.parseTitle()],
+            ['system', () => this.parseSystemBlock()],
+        ]);
+        for (const keyword of ELEMENT_KEYWORDS) {
+            const builder = ELEMENT_BUILDERS.get(keyword)!;
+            handlers.set(keyword, () => this.parseElementDecl(builder));
+        }
+        this.keywordHandlers = handlers;
     }
 
     parse(): ProcessModel {
-        this.tokens = new Lexer(this.source).tokenize();
+        // Comments carry no meaning for the model; newlines still end statements
+        this.tokens = new Lexer(this.source, { skipComments: true }).tokenize();
         this.pos = 0;
 
         this.skipTrivial();
@@ -86,18 +158,10 @@ export class FpdParser {
     private parseStatement(): void {
         const token = this.current();
 
-        if (token.type === TokenType.COMMENT) {
-            this.advance();
-            return;
-        }
-
         if (token.type === TokenType.KEYWORD) {
-            if (token.value === 'title') {
-                this.parseTitle();
-            } else if (token.value === 'system') {
-                this.parseSystemBlock();
-            } else if (ELEMENT_KEYWORDS.has(token.value)) {
-                this.parseElementDecl();
+            const handler = this.keywordHandlers.get(token.value);
+            if (handler) {
+                handler();
             } else {
                 this.model.errors.push(`Line ${token.line}: Unknown keyword '${token.value}'`);
                 this.advance();
@@ -189,7 +253,7 @@ export class FpdParser {
 
     // -- Element declarations --
 
-    private parseElementDecl(): void {
+    private parseElementDecl(builder: ElementBuilder): void {
         const keywordToken = this.current();
         const keyword = keywordToken.value;
         this.advance(); // consume keyword
@@ -222,7 +286,7 @@ export class FpdParser {
         if (this.check(TokenType.ANNOTATION)) {
             const annotationValue = this.current().value;
             this.advance();
-            if (keyword in STATE_KEYWORD_MAP) {
+            if (builder.acceptsPlacement) {
                 placement = ANNOTATION_MAP[annotationValue];
             } else {
                 this.model.warnings.push(
@@ -236,33 +300,17 @@ export class FpdParser {
         const ident: Identification = { uniqueIdent: elemId, longName: label };
         this.elementIds.set(elemId, keyword);
 
-        if (keyword in STATE_KEYWORD_MAP) {
-            this.model.states.push({
-                id: elemId,
-                stateType: STATE_KEYWORD_MAP[keyword],
-                identification: ident,
-                label,
-                placement,
-                lineNumber: keywordToken.line,
-                systemId: this.currentSystemId ?? undefined,
-            } as State);
-        } else if (keyword === 'process_operator') {
-            this.model.processOperators.push({
-                id: elemId,
-                identification: ident,
-                label,
-                lineNumber: keywordToken.line,
-                systemId: this.currentSystemId ?? undefined,
-            } as ProcessOperator);
-        } else if (keyword === 'technical_resource') {
-            this.model.technicalResources.push({
+        builder.build(
+            this.model,
+            {
                 id: elemId,
                 identification: ident,
                 label,
                 lineNumber: keywordToken.line,
                 systemId: this.currentSystemId ?? undefined,
-            } as TechnicalResource);
-        }
+            },
+            placement,
+        );
     }
 
     // -- Connections --
@@ -349,20 +397,20 @@ export class FpdParser {
 
     // -- Token helpers --
 
+    // The lexer always ends the stream with EOF and advance() never moves past
+    // it, so pos is in bounds and reads need no range check.
+
     private current(): Token {
-        if (this.pos < this.tokens.length) {
-            return this.tokens[this.pos];
-        }
-        return { type: TokenType.EOF, value: '', line: 0, column: 0 };
+        return this.tokens[this.pos];
     }
 
     private check(tokenType: TokenType): boolean {
-        return this.current().type === tokenType;
+        return this.tokens[this.pos].type === tokenType;
     }
 
     private advance(): Token {
-        const token = this.current();
-        if (this.pos < this.tokens.length) {
+        const token = this.tokens[this.pos];
+        if (this.pos < this.tokens.length - 1) {
             this.pos++;
         }
         return token;
@@ -378,11 +426,9 @@ export class FpdParser {
     }
 
     private skipTrivial(): void {
-        while (
-            this.current().type === TokenType.NEWLINE ||
-            this.current().type === TokenType.COMMENT
-        ) {
-            this.advance();
+        // The lexer drops comments for us, so only newlines remain between statements
+        while (this.tokens[this.pos].type === TokenType.NEWLINE) {
+            this.pos++;
         }
     }
 }
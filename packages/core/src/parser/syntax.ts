@@ -59,3 +59,17 @@ export const CONNECTION_OPERATORS: ReadonlyMap<string, TokenType> = new Map([
 export const CONNECTION_OPERATORS_SORTED: readonly string[] = [...CONNECTION_OPERATORS.keys()].sort(
     (a, b) => b.length - a.length,
 );
+
+/** Operators grouped by first character (longest first), so matching needs one lookup */
+export const CONNECTION_OPERATORS_BY_FIRST_CHAR: ReadonlyMap<string, readonly string[]> = (() => {
+    const byFirstChar = new Map<string, string[]>();
+    for (const op of CONNECTION_OPERATORS_SORTED) {
+        const group = byFirstChar.get(op[0]);
+        if (group) {
+            group.push(op);
+        } else {
+            byFirstChar.set(op[0], [op]);
+        }
+    }
+    return byFirstChar;
+})();
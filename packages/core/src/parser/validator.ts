@@ -4,60 +4,71 @@ import { ProcessModel } from '../models/processModel';
 
 type ElementCategory = 'state' | 'process_operator' | 'technical_resource';
 
+interface ElementInfo {
+    category: ElementCategory;
+    systemId: string | undefined;
+}
+
+/** Add `key` to `seen`; returns false if it was already present (one hash per call). */
+function addIfNew(seen: Set<string>, key: string): boolean {
+    const size = seen.size;
+    seen.add(key);
+    return seen.size !== size;
+}
+
 export function validateConnections(model: ProcessModel): string[] {
     const errors: string[] = [];
 
-    // Build lookup maps for O(1) access
-    const elementCategory = new Map<string, ElementCategory>();
-    const elementSystemId = new Map<string, string | undefined>();
+    // Build one lookup map for O(1) access to category and system per element
+    const elements = new Map<string, ElementInfo>();
 
     for (const s of model.states) {
-        elementCategory.set(s.id, 'state');
-        elementSystemId.set(s.id, s.systemId);
+        elements.set(s.id, { category: 'state', systemId: s.systemId });
     }
     for (const po of model.processOperators) {
-        elementCategory.set(po.id, 'process_operator');
-        elementSystemId.set(po.id, po.systemId);
+        elements.set(po.id, { category: 'process_operator', systemId: po.systemId });
     }
     for (const tr of model.technicalResources) {
-        elementCategory.set(tr.id, 'technical_resource');
-        elementSystemId.set(tr.id, tr.systemId);
+        elements.set(tr.id, { category: 'technical_resource', systemId: tr.systemId });
     }
 
+    // Cross-system references need two distinct systems, so with at most
+    // one declared system those checks can never fire
+    const multiSystem = model.systemLimits.length > 1;
+
     // Track seen flow connections for duplicate detection
     const seenFlows = new Set<string>();
 
     for (const flow of model.flows) {
-        const sourceType = elementCategory.get(flow.sourceRef) ?? null;
-        const targetType = elementCategory.get(flow.targetRef) ?? null;
+        const source = elements.get(flow.sourceRef);
+        const target = elements.get(flow.targetRef);
 
         // Check references exist
-        if (sourceType === null) {
+        if (!source) {
             errors.push(`Flow '${flow.id}': source '${flow.sourceRef}' not found`);
             continue;
         }
-        if (targetType === null) {
+        if (!target) {
             errors.push(`Flow '${flow.id}': target '${flow.targetRef}' not found`);
             continue;
         }
+        const sourceType = source.category;
+        const targetType = target.category;
 
         // Check for duplicate flows
-        const pair = `${flow.sourceRef}:${flow.targetRef}`;
-        if (seenFlows.has(pair)) {
+        if (!addIfNew(seenFlows, `${flow.sourceRef}:${flow.targetRef}`)) {
             errors.push(
                 `Flow '${flow.id}': duplicate connection from ` +
                     `'${flow.sourceRef}' to '${flow.targetRef}'`,
             );
-        } else {
-            seenFlows.add(pair);
         }
 
         // Validate source-target pairs for flows
         let valid = false;
         if (sourceType === 'state' && targetType === 'state') {
             // State -> State: only allowed as cross-system connection
-            const sourceSys = elementSystemId.get(flow.sourceRef);
-            const targetSys = elementSystemId.get(flow.targetRef);
+            const sourceSys = source.systemId;
+            const targetSys = target.systemId;
             if (
                 flow.systemId === undefined &&
                 sourceSys !== targetSys &&
@@ -90,14 +101,11 @@ export function validateConnections(model: ProcessModel): string[] {
             continue;
         }
 
-        // Check for cross-system State <-> ProcessOperator flows
-        if (
-            model.systemLimits.length > 0 &&
-            ((sourceType === 'state' && targetType === 'process_operator') ||
-                (sourceType === 'process_operator' && targetType === 'state'))
-        ) {
-            const sourceSys = elementSystemId.get(flow.sourceRef);
-            const targetSys = elementSystemId.get(flow.targetRef);
+        // Check for cross-system State <-> ProcessOperator flows (the only
+        // valid pairs left whose categories differ)
+        if (multiSystem && sourceType !== targetType) {
+            const sourceSys = source.systemId;
+            const targetSys = target.systemId;
             if (sourceSys !== undefined && targetSys !== undefined && sourceSys !== targetSys) {
                 errors.push(
                     `Flow '${flow.id}': cross-system reference from ` +
@@ -113,17 +121,17 @@ export function validateConnections(model: ProcessModel): string[] {
     const seenUsages = new Set<string>();
 
     for (const usage of model.usages) {
-        const poType = elementCategory.get(usage.processOperatorRef) ?? null;
-        const trType = elementCategory.get(usage.technicalResourceRef) ?? null;
+        const po = elements.get(usage.processOperatorRef);
+        const tr = elements.get(usage.technicalResourceRef);
 
-        if (poType === null) {
+        if (!po) {
             errors.push(
                 `Usage '${usage.id}': process operator ` +
                     `'${usage.processOperatorRef}' not found`,
             );
             continue;
         }
-        if (trType === null) {
+        if (!tr) {
             errors.push(
                 `Usage '${usage.id}': technical resource ` +
                     `'${usage.technicalResourceRef}' not found`,
@@ -131,12 +139,12 @@ export function validateConnections(model: ProcessModel): string[] {
             continue;
         }
 
-        if (poType !== 'process_operator') {
+        if (po.category !== 'process_operator') {
             errors.push(
                 `Usage '${usage.id}': '${usage.processOperatorRef}' ` + `is not a ProcessOperator`,
             );
         }
-        if (trType !== 'technical_resource') {
+        if (tr.category !== 'technical_resource') {
             errors.push(
                 `Usage '${usage.id}': '${usage.technicalResourceRef}' ` +
                     `is not a TechnicalResource`,
@@ -144,9 +152,9 @@ export function validateConnections(model: ProcessModel): string[] {
         }
 
         // Check for cross-system usages
-        if (model.systemLimits.length > 0) {
-            const poSys = elementSystemId.get(usage.processOperatorRef);
-            const trSys = elementSystemId.get(usage.technicalResourceRef);
+        if (multiSystem) {
+            const poSys = po.systemId;
+            const trSys = tr.systemId;
             if (poSys !== undefined && trSys !== undefined && poSys !== trSys) {
                 errors.push(
                     `Usage '${usage.id}': cross-system reference between ` +
@@ -160,14 +168,12 @@ export function validateConnections(model: ProcessModel): string[] {
 
         // Check for duplicate usages
         const uPair = `${usage.processOperatorRef}:${usage.technicalResourceRef}`;
-        if (seenUsages.has(uPair)) {
+        if (!addIfNew(seenUsages, uPair)) {
             errors.push(
                 `Usage '${usage.id}': duplicate usage between ` +
                     `'${usage.processOperatorRef}' and ` +
                     `'${usage.technicalResourceRef}'`,
             );
-        } else {
-            seenUsages.add(uPair);
         }
     }
 
@@ -70,6 +70,24 @@ describe('FpdService', () => {
         });
     });
 
+    // -----------------------------------------------------------------
+    // parseShared()
+    // -----------------------------------------------------------------
+
+    describe('parseShared', () => {
+        it('reuses the result for an unchanged source', () => {
+            const first = service.parseShared(VALID_SOURCE);
+            expect(service.parseShared(VALID_SOURCE)).toBe(first);
+            expect(first.model.title).toBe('Test Process');
+        });
+
+        it('is not affected by mutations of a parse() result', () => {
+            service.parseShared(VALID_SOURCE);
+            service.parse(VALID_SOURCE).model.title = 'Mutated';
+            expect(service.parseShared(VALID_SOURCE).model.title).toBe('Test Process');
+        });
+    });
+
     // -----------------------------------------------------------------
     // renderSvg()
     // -----------------------------------------------------------------
@@ -146,6 +164,13 @@ describe('FpdService', () => {
             expect(text).toContain('p1 --> po1');
             expect(text).toContain('po1 <..> tr1');
         });
+
+        it('is not affected by mutations of an earlier parse() result', () => {
+            service.exportText(VALID_SOURCE);
+            const { model } = service.parse(VALID_SOURCE);
+            model.title = 'Mutated';
+            expect(service.exportText(VALID_SOURCE)).toContain('title "Test Process"');
+        });
     });
 
     // -----------------------------------------------------------------
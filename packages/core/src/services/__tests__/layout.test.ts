@@ -94,6 +94,35 @@ function centerY(el: LayoutElement): number {
     return el.y + el.height / 2;
 }
 
+/**
+ * Pairs of same-type elements whose boxes overlap, as "a overlaps b".
+ * Sweeps each type's elements in x order, so only pairs whose x-ranges
+ * intersect are compared.
+ */
+function findSameTypeOverlaps(elements: LayoutElement[]): string[] {
+    const byType = new Map<string, LayoutElement[]>();
+    for (const el of elements) {
+        const group = byType.get(el.type);
+        if (group) group.push(el);
+        else byType.set(el.type, [el]);
+    }
+
+    const overlaps: string[] = [];
+    for (const group of byType.values()) {
+        group.sort((a, b) => a.x - b.x);
+        for (let i = 0; i < group.length; i++) {
+            const a = group[i];
+            for (let j = i + 1; j < group.length && group[j].x < a.x + a.width; j++) {
+                const b = group[j];
+                if (a.y < b.y + b.height && a.y + a.height > b.y) {
+                    overlaps.push(`${a.id} overlaps ${b.id}`);
+                }
+            }
+        }
+    }
+    return overlaps;
+}
+
 // ---------------------------------------------------------------------------
 // Tests
 // ---------------------------------------------------------------------------
@@ -138,6 +167,25 @@ describe('computeLayout', () => {
             expect(s.type).toBe('state');
             expect(s.stateType).toBe('product');
         });
+
+        it('places states below resources when the model has no POs or flows', () => {
+            const model = buildModel((m) => {
+                m.states.push(makeState('s1'));
+                m.states.push(makeState('s2'));
+                m.technicalResources.push(makeTR('tr1'));
+                m.technicalResources.push(makeTR('tr2'));
+            });
+            const layout = computeLayout(model);
+
+            const [tr1, tr2] = [findElement(layout, 'tr1'), findElement(layout, 'tr2')];
+            const [s1, s2] = [findElement(layout, 's1'), findElement(layout, 's2')];
+            expect(tr1.x).toBe(tr2.x);
+            expect(tr1.y).toBeLessThan(tr2.y);
+            expect(s1.y).toBe(s2.y);
+            expect(s1.y).toBeGreaterThan(tr2.y + tr2.height);
+            expect(s1.x).toBeLessThan(s2.x);
+            expect(layout.systemLimits).toHaveLength(0);
+        });
     });
 
     // -----------------------------------------------------------------------
@@ -258,6 +306,26 @@ describe('computeLayout', () => {
             expect(po2.y).toBeLessThan(po3.y);
         });
 
+        it('places every PO of one dependency level before the next level', () => {
+            // po1 feeds pz and pa; only pa feeds pb, so pb sits below pz
+            const model = buildModel((m) => {
+                for (const id of ['s1', 's2', 's3']) m.states.push(makeState(id));
+                for (const id of ['po1', 'pz', 'pa', 'pb']) m.processOperators.push(makePO(id));
+                m.flows.push(makeFlow('po1', 's1'));
+                m.flows.push(makeFlow('s1', 'pz'));
+                m.flows.push(makeFlow('s1', 'pa'));
+                m.flows.push(makeFlow('pa', 's2'));
+                m.flows.push(makeFlow('s2', 'pb'));
+                m.flows.push(makeFlow('pb', 's3'));
+            });
+
+            const layout = computeLayout(model);
+            const ys = ['po1', 'pa', 'pz', 'pb'].map((id) => findElement(layout, id).y);
+            expect(ys[0]).toBeLessThan(ys[1]);
+            expect(ys[1]).toBeLessThan(ys[2]);
+            expect(ys[2]).toBeLessThan(ys[3]);
+        });
+
         it('handles cycle in PO dependencies without crashing', () => {
             // po1 -> s1 -> po2 -> s2 -> po1 (cycle)
             const model = buildModel((m) => {
@@ -277,6 +345,31 @@ describe('computeLayout', () => {
             // Both POs should be present
             expect(layout.elements.filter((e) => e.type === 'processOperator')).toHaveLength(2);
         });
+
+        it('ranks a PO whose id names an Object.prototype member', () => {
+            // s1 -> __proto__ -> s2 -> po2 -> s3, with a resource on __proto__
+            const model = buildModel((m) => {
+                m.states.push(makeState('s1'));
+                m.states.push(makeState('s2'));
+                m.states.push(makeState('s3'));
+                m.processOperators.push(makePO('__proto__'));
+                m.processOperators.push(makePO('po2'));
+                m.technicalResources.push(makeTR('tr1'));
+                m.flows.push(makeFlow('s1', '__proto__'));
+                m.flows.push(makeFlow('__proto__', 's2'));
+                m.flows.push(makeFlow('s2', 'po2'));
+                m.flows.push(makeFlow('po2', 's3'));
+                m.usages.push(makeUsage('__proto__', 'tr1'));
+            });
+
+            const layout = computeLayout(model);
+            for (const el of layout.elements) {
+                expect(Number.isFinite(el.x), `${el.id}.x`).toBe(true);
+                expect(Number.isFinite(el.y), `${el.id}.y`).toBe(true);
+            }
+            expect(Number.isFinite(layout.systemLimit!.height)).toBe(true);
+            expect(findElement(layout, '__proto__').y).toBeLessThan(findElement(layout, 'po2').y);
+        });
     });
 
     // -----------------------------------------------------------------------
@@ -1056,20 +1149,7 @@ describe('computeLayout', () => {
             expect(layout.elements).toHaveLength(76);
 
             // No same-type elements should overlap
-            for (let i = 0; i < layout.elements.length; i++) {
-                for (let j = i + 1; j < layout.elements.length; j++) {
-                    const a = layout.elements[i];
-                    const b = layout.elements[j];
-                    if (a.type !== b.type) continue;
-
-                    const overlap =
-                        a.x < b.x + b.width &&
-                        a.x + a.width > b.x &&
-                        a.y < b.y + b.height &&
-                        a.y + a.height > b.y;
-                    expect(overlap, `${a.id} overlaps ${b.id}`).toBe(false);
-                }
-            }
+            expect(findSameTypeOverlaps(layout.elements)).toEqual([]);
 
             // All coordinates must be finite
             for (const el of layout.elements) {
@@ -1102,19 +1182,8 @@ describe('computeLayout', () => {
             const layout1 = computeLayout(model);
             const layout2 = computeLayout(model);
 
-            // Same number of elements and connections
-            expect(layout1.elements).toHaveLength(layout2.elements.length);
-            expect(layout1.connections).toHaveLength(layout2.connections.length);
-
-            // Every element should have identical coordinates
-            for (const el1 of layout1.elements) {
-                const el2 = layout2.elements.find((e) => e.id === el1.id)!;
-                expect(el2).toBeDefined();
-                expect(el1.x).toBe(el2.x);
-                expect(el1.y).toBe(el2.y);
-                expect(el1.width).toBe(el2.width);
-                expect(el1.height).toBe(el2.height);
-            }
+            // Elements, connections and system limits must match exactly
+            expect(layout2).toEqual(layout1);
         });
     });
 });
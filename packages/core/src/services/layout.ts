@@ -101,12 +101,9 @@ const BOUNDARY_EXTRA_V = 40;
 interface ConnectivityGraph {
     stateToTargetPos: Record<string, string[]>;
     stateToSourcePos: Record<string, string[]>;
-    poToInputStates: Record<string, string[]>;
-    poToOutputStates: Record<string, string[]>;
     trToPo: Record<string, string>;
-    allFlowRefs: Set<string>;
-    poIds: Set<string>;
-    altFlowOnlySinks: Set<string>;
+    allFlowRefs: ReadonlySet<string>;
+    poIds: ReadonlySet<string>;
 }
 
 interface StateAffinity {
@@ -152,21 +149,11 @@ function _buildConnectivityGraph(
 
     const stateToTargetPos: Record<string, string[]> = {};
     const stateToSourcePos: Record<string, string[]> = {};
-    const poToInputStates: Record<string, string[]> = {};
-    const poToOutputStates: Record<string, string[]> = {};
 
     for (const s of states) {
         stateToTargetPos[s.id] = [];
         stateToSourcePos[s.id] = [];
     }
-    for (const p of processOperators) {
-        poToInputStates[p.id] = [];
-        poToOutputStates[p.id] = [];
-    }
-
-    // Track flow types for PO->State flows to detect alt-flow-only sinks
-    const stateHasRegularFromPo = new Set<string>();
-    const stateHasAltFromPo = new Set<string>();
 
     for (const flow of flows) {
         allFlowRefs.add(flow.sourceRef);
@@ -174,24 +161,8 @@ function _buildConnectivityGraph(
 
         if (stateIds.has(flow.sourceRef) && poIds.has(flow.targetRef)) {
             stateToTargetPos[flow.sourceRef].push(flow.targetRef);
-            poToInputStates[flow.targetRef].push(flow.sourceRef);
         } else if (poIds.has(flow.sourceRef) && stateIds.has(flow.targetRef)) {
             stateToSourcePos[flow.targetRef].push(flow.sourceRef);
-            poToOutputStates[flow.sourceRef].push(flow.targetRef);
-
-            if (flow.flowType === 'alternativeFlow') {
-                stateHasAltFromPo.add(flow.targetRef);
-            } else {
-                stateHasRegularFromPo.add(flow.targetRef);
-            }
-        }
-    }
-
-    // Alt-flow-only sinks: states that receive ONLY alternative flows from POs
-    const altFlowOnlySinks = new Set<string>();
-    for (const sid of stateHasAltFromPo) {
-        if (!stateHasRegularFromPo.has(sid)) {
-            altFlowOnlySinks.add(sid);
         }
     }
 
@@ -203,12 +174,9 @@ function _buildConnectivityGraph(
     return {
         stateToTargetPos,
         stateToSourcePos,
-        poToInputStates,
-        poToOutputStates,
         trToPo,
         allFlowRefs,
         poIds,
-        altFlowOnlySinks,
     };
 }
 
@@ -218,68 +186,89 @@ function _topologicalSortPos(
     processOperators: ProcessOperator[],
     states: State[],
     graph: ConnectivityGraph,
-): [string[], Record<string, number>] {
-    const poIds = new Set(processOperators.map((p) => p.id));
-
-    // Build PO precedence graph
-    const poSuccessors: Record<string, Set<string>> = {};
-    const poPredecessors: Record<string, Set<string>> = {};
+): [string[], Map<string, number>] {
+    // Build PO precedence graph, counting each distinct predecessor once.
+    // The adjacency lists only hold PO ids, so they need no membership check.
+    // PO ids are user-chosen and may name Object.prototype members such as
+    // '__proto__', so everything keyed by them here is a Map
+    const poSuccessors = new Map<string, Set<string>>();
+    const inDegree = new Map<string, number>();
     for (const p of processOperators) {
-        poSuccessors[p.id] = new Set();
-        poPredecessors[p.id] = new Set();
+        poSuccessors.set(p.id, new Set());
+        inDegree.set(p.id, 0);
     }
 
+    const { stateToSourcePos, stateToTargetPos } = graph;
     for (const state of states) {
-        const sourcePos = graph.stateToSourcePos[state.id] || [];
-        const targetPos = graph.stateToTargetPos[state.id] || [];
+        const sourcePos = stateToSourcePos[state.id];
+        const targetPos = stateToTargetPos[state.id];
         if (sourcePos.length > 0 && targetPos.length > 0) {
             for (const srcPo of sourcePos) {
+                const successors = poSuccessors.get(srcPo)!;
                 for (const tgtPo of targetPos) {
-                    if (srcPo !== tgtPo && poIds.has(srcPo) && poIds.has(tgtPo)) {
-                        poSuccessors[srcPo].add(tgtPo);
-                        poPredecessors[tgtPo].add(srcPo);
+                    if (srcPo !== tgtPo && !successors.has(tgtPo)) {
+                        successors.add(tgtPo);
+                        inDegree.set(tgtPo, inDegree.get(tgtPo)! + 1);
                     }
                 }
             }
         }
     }
 
-    // Kahn's algorithm with cycle breaking
-    const inDegree: Record<string, number> = {};
+    // Kahn's algorithm with cycle breaking, processed in sorted batches: a
+    // batch holds the POs whose in-degree dropped to zero while the previous
+    // batch was placed, so no pass rescans the POs that are still waiting.
+    const remaining = new Set<string>();
+    let ready: string[] = [];
     for (const p of processOperators) {
-        inDegree[p.id] = poPredecessors[p.id].size;
+        remaining.add(p.id);
+        if (inDegree.get(p.id) === 0) {
+            ready.push(p.id);
+        }
     }
 
     const poOrder: string[] = [];
-    const poRank: Record<string, number> = {};
-    const remaining = new Set(processOperators.map((p) => p.id));
+    const poRank = new Map<string, number>();
     let currentRank = 0;
 
     while (remaining.size > 0) {
-        let ready = Array.from(remaining)
-            .filter((pid) => (inDegree[pid] ?? 0) === 0)
-            .sort();
-
         if (ready.length === 0) {
             // Cycle: pick node with lowest in_degree
-            const byDegree = Array.from(remaining).sort(
-                (a, b) => (inDegree[a] ?? 0) - (inDegree[b] ?? 0) || a.localeCompare(b),
-            );
-            ready = [byDegree[0]];
+            let pick: string | undefined;
+            for (const pid of remaining) {
+                if (
+                    pick === undefined ||
+                    inDegree.get(pid)! < inDegree.get(pick)! ||
+                    (inDegree.get(pid) === inDegree.get(pick) && pid.localeCompare(pick) < 0)
+                ) {
+                    pick = pid;
+                }
+            }
+            ready = [pick!];
+        } else {
+            ready.sort();
         }
 
+        const next: string[] = [];
         for (const poId of ready) {
+            if (!remaining.delete(poId)) {
+                continue;
+            }
             poOrder.push(poId);
-            poRank[poId] = currentRank;
-            remaining.delete(poId);
-            for (const succ of poSuccessors[poId] ?? []) {
+            poRank.set(poId, currentRank);
+            for (const succ of poSuccessors.get(poId)!) {
                 if (remaining.has(succ)) {
-                    inDegree[succ] = (inDegree[succ] ?? 1) - 1;
+                    const degree = inDegree.get(succ)! - 1;
+                    inDegree.set(succ, degree);
+                    if (degree === 0) {
+                        next.push(succ);
+                    }
                 }
             }
             // Each PO gets its own rank so it receives a unique row position.
             currentRank += 1;
         }
+        ready = next;
     }
 
     return [poOrder, poRank];
@@ -287,46 +276,52 @@ function _topologicalSortPos(
 
 // ---------- Phase 2: Classify states ----------
 
-function _productBoundarySide(
-    isInput: boolean,
-    poRank: Record<string, number> | undefined,
-    connectedPos: string[],
-    maxRank: number,
-): string {
-    if (isInput) {
-        if (poRank && connectedPos.length > 0 && maxRank > 0) {
-            const minRank = Math.min(...connectedPos.map((pid) => poRank[pid] ?? 0));
-            if (minRank > 0) {
-                return 'boundary-left';
-            }
-        }
-        return 'boundary-top';
-    } else {
-        if (poRank && connectedPos.length > 0 && maxRank > 0) {
-            const maxSrcRank = Math.max(...connectedPos.map((pid) => poRank[pid] ?? 0));
-            if (maxSrcRank < maxRank) {
-                return 'boundary-right';
-            }
-        }
-        return 'boundary-bottom';
+// The adjacency lists only hold ids from graph.poIds and the topological sort
+// ranks every one of them, so ranks are read without a fallback.
+
+/** Lowest rank among `poIdList`; the list must be non-empty. */
+function _minPoRank(poIdList: string[], poRank: Map<string, number>): number {
+    let result = poRank.get(poIdList[0])!;
+    for (let i = 1; i < poIdList.length; i++) {
+        result = Math.min(result, poRank.get(poIdList[i])!);
     }
+    return result;
 }
 
+/** Highest rank among `poIdList`; the list must be non-empty. */
+function _maxPoRank(poIdList: string[], poRank: Map<string, number>): number {
+    let result = poRank.get(poIdList[0])!;
+    for (let i = 1; i < poIdList.length; i++) {
+        result = Math.max(result, poRank.get(poIdList[i])!);
+    }
+    return result;
+}
+
+/**
+ * Category of a connected state. `sourceRank` is the highest rank of the POs
+ * producing the state and `targetRank` the lowest rank of the POs consuming
+ * it; either is undefined when the state has no such PO.
+ */
 function _classifyState(
     state: State,
-    graph: ConnectivityGraph,
-    poRank?: Record<string, number>,
-    maxRank: number = 0,
+    sourceRank: number | undefined,
+    targetRank: number | undefined,
+    maxRank: number,
 ): string {
-    if (!graph.allFlowRefs.has(state.id)) {
-        return 'disconnected';
-    }
-
-    const sourcePos = graph.stateToSourcePos[state.id] || [];
-    const targetPos = graph.stateToTargetPos[state.id] || [];
-    const isPureSource = targetPos.length > 0 && sourcePos.length === 0;
-    const isPureSink = sourcePos.length > 0 && targetPos.length === 0;
-    const isIntermediate = sourcePos.length > 0 && targetPos.length > 0;
+    const isPureSource = targetRank !== undefined && sourceRank === undefined;
+    const isPureSink = sourceRank !== undefined && targetRank === undefined;
+    const isIntermediate = sourceRank !== undefined && targetRank !== undefined;
+
+    // Product inputs feeding only later POs enter from the left, product
+    // outputs of earlier POs leave to the right
+    const productInputSide =
+        maxRank > 0 && targetRank !== undefined && targetRank > 0
+            ? 'boundary-left'
+            : 'boundary-top';
+    const productOutputSide =
+        maxRank > 0 && sourceRank !== undefined && sourceRank < maxRank
+            ? 'boundary-right'
+            : 'boundary-bottom';
 
     // 1. Explicit directional override
     if (state.placement === 'boundary-top') {
@@ -348,16 +343,10 @@ function _classifyState(
     // 2. @boundary (auto-detect side)
     if (state.placement === 'boundary') {
         if (isPureSource) {
-            if (state.stateType === 'product') {
-                return _productBoundarySide(true, poRank, targetPos, maxRank);
-            }
-            return 'boundary-left';
+            return state.stateType === 'product' ? productInputSide : 'boundary-left';
         }
         if (isPureSink) {
-            if (state.stateType === 'product') {
-                return _productBoundarySide(false, poRank, sourcePos, maxRank);
-            }
-            return 'boundary-right';
+            return state.stateType === 'product' ? productOutputSide : 'boundary-right';
         }
         if (state.stateType === 'product') {
             return 'boundary-top';
@@ -371,17 +360,11 @@ function _classifyState(
     }
 
     if (isPureSource) {
-        if (state.stateType === 'product') {
-            return _productBoundarySide(true, poRank, targetPos, maxRank);
-        }
-        return 'boundary-left';
+        return state.stateType === 'product' ? productInputSide : 'boundary-left';
     }
 
     if (isPureSink) {
-        if (state.stateType === 'product') {
-            return _productBoundarySide(false, poRank, sourcePos, maxRank);
-        }
-        return 'boundary-right';
+        return state.stateType === 'product' ? productOutputSide : 'boundary-right';
     }
 
     return 'boundary-top';
@@ -392,35 +375,42 @@ function _classifyState(
 function _assignStateAffinities(
     states: State[],
     graph: ConnectivityGraph,
-    poRank: Record<string, number>,
+    poRank: Map<string, number>,
     maxRank: number = 0,
 ): Record<string, StateAffinity> {
     const affinities: Record<string, StateAffinity> = {};
+    // Both maps hold an entry for every state, so no fallback is needed
+    const { allFlowRefs, stateToSourcePos, stateToTargetPos } = graph;
 
     for (const state of states) {
-        const category = _classifyState(state, graph, poRank, maxRank);
-        const sourcePos = graph.stateToSourcePos[state.id] || [];
-        const targetPos = graph.stateToTargetPos[state.id] || [];
+        if (!allFlowRefs.has(state.id)) {
+            affinities[state.id] = {
+                category: 'disconnected',
+                affiliatedRank: 0,
+                sourceRank: undefined,
+                targetRank: undefined,
+            };
+            continue;
+        }
+
+        // One pass over the connected POs serves both classification and row affinity
+        const sourcePos = stateToSourcePos[state.id];
+        const targetPos = stateToTargetPos[state.id];
+        const maxSourceRank = sourcePos.length > 0 ? _maxPoRank(sourcePos, poRank) : undefined;
+        const minTargetRank = targetPos.length > 0 ? _minPoRank(targetPos, poRank) : undefined;
+        const category = _classifyState(state, maxSourceRank, minTargetRank, maxRank);
 
         let affiliatedRank = 0;
         let sourceRank: number | undefined = undefined;
         let targetRank: number | undefined = undefined;
 
         if (category === 'boundary-left') {
-            if (targetPos.length > 0) {
-                affiliatedRank = Math.min(...targetPos.map((pid) => poRank[pid] ?? 0));
-            }
+            affiliatedRank = minTargetRank ?? 0;
         } else if (category === 'boundary-right') {
-            if (sourcePos.length > 0) {
-                affiliatedRank = Math.max(...sourcePos.map((pid) => poRank[pid] ?? 0));
-            }
+            affiliatedRank = maxSourceRank ?? 0;
         } else if (category === 'internal') {
-            if (sourcePos.length > 0) {
-                sourceRank = Math.max(...sourcePos.map((pid) => poRank[pid] ?? 0));
-            }
-            if (targetPos.length > 0) {
-                targetRank = Math.min(...targetPos.map((pid) => poRank[pid] ?? 0));
-            }
+            sourceRank = maxSourceRank;
+            targetRank = minTargetRank;
             affiliatedRank = sourceRank !== undefined ? sourceRank : (targetRank ?? 0);
         }
 
@@ -437,6 +427,49 @@ function _assignStateAffinities(
 
 // ---------- Helpers ----------
 
+// Every element of a kind is built by one of these functions, so all of them
+// share a single object shape.
+
+function _stateElement(state: State, x: number, y: number): LayoutElement {
+    return {
+        id: state.id,
+        type: 'state',
+        label: state.label,
+        x,
+        y,
+        width: STATE_MAX_W,
+        height: STATE_H,
+        stateType: state.stateType,
+        lineNumber: state.lineNumber,
+    };
+}
+
+function _processElement(po: ProcessOperator, x: number, y: number): LayoutElement {
+    return {
+        id: po.id,
+        type: 'processOperator',
+        label: po.label,
+        x,
+        y,
+        width: PROCESS_W,
+        height: PROCESS_H,
+        lineNumber: po.lineNumber,
+    };
+}
+
+function _resourceElement(tr: TechnicalResource, x: number, y: number): LayoutElement {
+    return {
+        id: tr.id,
+        type: 'technicalResource',
+        label: tr.label,
+        x,
+        y,
+        width: RESOURCE_W,
+        height: RESOURCE_H,
+        lineNumber: tr.lineNumber,
+    };
+}
+
 function _distributeCentered(
     count: number,
     itemSize: number,
@@ -457,12 +490,20 @@ function _distributeCentered(
 
 // ---------- Phase 4a: Group classified states by category ----------
 
+/** Internal states between a source PO row and a later target PO row */
+interface InternalGap {
+    sourceRank: number;
+    targetRank: number;
+    states: State[];
+}
+
 interface ClassifiedStates {
     boundaryTop: State[];
     boundaryBottom: State[];
     boundaryLeft: Record<number, State[]>;
     boundaryRight: Record<number, State[]>;
-    internalsByGap: Record<string, State[]>;
+    /** Forward internal gaps, keyed by "sourceRank-targetRank" */
+    internalsByGap: Map<string, InternalGap>;
     backwardInternals: State[];
     disconnectedStates: State[];
     hasIntermediatesBelow: Set<number>;
@@ -476,62 +517,68 @@ function _groupStatesByCategory(
     const boundaryBottom: State[] = [];
     const boundaryLeft: Record<number, State[]> = {};
     const boundaryRight: Record<number, State[]> = {};
-    const internalStates: State[] = [];
+    const internalsByGap = new Map<string, InternalGap>();
+    const backwardInternals: State[] = [];
     const disconnectedStates: State[] = [];
+    const hasIntermediatesBelow = new Set<number>();
 
+    // Internal states are split into forward gaps and feedback states in the
+    // same pass that buckets the boundary states
     for (const state of states) {
         const aff = affinities[state.id];
         if (!aff) {
             disconnectedStates.push(state);
             continue;
         }
-        const cat = aff.category;
-        if (cat === 'boundary-top') {
-            boundaryTop.push(state);
-        } else if (cat === 'boundary-bottom') {
-            boundaryBottom.push(state);
-        } else if (cat === 'boundary-left') {
-            const rank = aff.affiliatedRank;
-            if (!boundaryLeft[rank]) {
-                boundaryLeft[rank] = [];
+        switch (aff.category) {
+            case 'boundary-top':
+                boundaryTop.push(state);
+                break;
+            case 'boundary-bottom':
+                boundaryBottom.push(state);
+                break;
+            case 'boundary-left': {
+                const rank = aff.affiliatedRank;
+                if (!boundaryLeft[rank]) {
+                    boundaryLeft[rank] = [];
+                }
+                boundaryLeft[rank].push(state);
+                break;
             }
-            boundaryLeft[rank].push(state);
-        } else if (cat === 'boundary-right') {
-            const rank = aff.affiliatedRank;
-            if (!boundaryRight[rank]) {
-                boundaryRight[rank] = [];
+            case 'boundary-right': {
+                const rank = aff.affiliatedRank;
+                if (!boundaryRight[rank]) {
+                    boundaryRight[rank] = [];
+                }
+                boundaryRight[rank].push(state);
+                break;
             }
-            boundaryRight[rank].push(state);
-        } else if (cat === 'internal') {
-            internalStates.push(state);
-        } else {
-            disconnectedStates.push(state);
-        }
-    }
-
-    const internalsByGap: Record<string, State[]> = {};
-    const backwardInternals: State[] = [];
-    for (const state of internalStates) {
-        const aff = affinities[state.id];
-        const sRank = aff.sourceRank !== undefined ? aff.sourceRank : aff.affiliatedRank;
-        const tRank = aff.targetRank !== undefined ? aff.targetRank : sRank + 1;
-        if (sRank < tRank) {
-            const key = `${sRank}-${tRank}`;
-            if (!internalsByGap[key]) {
-                internalsByGap[key] = [];
+            case 'internal': {
+                const sRank = aff.sourceRank !== undefined ? aff.sourceRank : aff.affiliatedRank;
+                const tRank = aff.targetRank !== undefined ? aff.targetRank : sRank + 1;
+                if (sRank < tRank) {
+                    const key = `${sRank}-${tRank}`;
+                    const gap = internalsByGap.get(key);
+                    if (gap) {
+                        gap.states.push(state);
+                    } else {
+                        internalsByGap.set(key, {
+                            sourceRank: sRank,
+                            targetRank: tRank,
+                            states: [state],
+                        });
+                    }
+                    hasIntermediatesBelow.add(sRank);
+                } else {
+                    backwardInternals.push(state);
+                }
+                break;
             }
-            internalsByGap[key].push(state);
-        } else {
-            backwardInternals.push(state);
+            default:
+                disconnectedStates.push(state);
         }
     }
 
-    const hasIntermediatesBelow = new Set<number>();
-    for (const key of Object.keys(internalsByGap)) {
-        const sRank = parseInt(key.split('-')[0], 10);
-        hasIntermediatesBelow.add(sRank);
-    }
-
     return {
         boundaryTop,
         boundaryBottom,
@@ -550,7 +597,7 @@ function _computeSystemLimitAndPlaceBoundaries(
     coreElements: LayoutElement[],
     classified: ClassifiedStates,
     config: LayoutConfig,
-    poRowY: Record<number, number>,
+    poRowY: readonly number[],
     startY: number,
     coreLeftX: number,
 ): { systemLimit: BoundsRect; boundaryElements: LayoutElement[] } | null {
@@ -565,10 +612,17 @@ function _computeSystemLimitAndPlaceBoundaries(
     let slMinX: number, slMinY: number, slMaxX: number, slMaxY: number;
 
     if (coreElements.length > 0) {
-        slMinX = Math.min(...coreElements.map((e) => e.x));
-        slMinY = Math.min(...coreElements.map((e) => e.y));
-        slMaxX = Math.max(...coreElements.map((e) => e.x + e.width));
-        slMaxY = Math.max(...coreElements.map((e) => e.y + e.height));
+        // One pass for all four extents
+        slMinX = Infinity;
+        slMinY = Infinity;
+        slMaxX = -Infinity;
+        slMaxY = -Infinity;
+        for (const e of coreElements) {
+            slMinX = Math.min(slMinX, e.x);
+            slMinY = Math.min(slMinY, e.y);
+            slMaxX = Math.max(slMaxX, e.x + e.width);
+            slMaxY = Math.max(slMaxY, e.y + e.height);
+        }
     } else {
         slMinX = coreLeftX;
         slMinY = startY;
@@ -645,18 +699,7 @@ function _computeSystemLimitAndPlaceBoundaries(
 
     function pushStateElements(states: State[], xs: number[], y: number) {
         for (let i = 0; i < states.length; i++) {
-            const s = states[i];
-            boundaryElements.push({
-                id: s.id,
-                type: 'state',
-                label: s.label,
-                x: xs[i],
-                y,
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: s.stateType,
-                lineNumber: s.lineNumber,
-            });
+            boundaryElements.push(_stateElement(states[i], xs[i], y));
         }
     }
 
@@ -680,18 +723,7 @@ function _computeSystemLimitAndPlaceBoundaries(
         const rowCenterY = (poRowY[rank] ?? startY) + PROCESS_H / 2;
         const ys = _distributeCentered(leftStates.length, STATE_H, config.hGap, rowCenterY);
         for (let i = 0; i < leftStates.length; i++) {
-            const s = leftStates[i];
-            boundaryElements.push({
-                id: s.id,
-                type: 'state',
-                label: s.label,
-                x: slLeft - STATE_MAX_W / 2,
-                y: ys[i],
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: s.stateType,
-                lineNumber: s.lineNumber,
-            });
+            boundaryElements.push(_stateElement(leftStates[i], slLeft - STATE_MAX_W / 2, ys[i]));
         }
     }
 
@@ -700,18 +732,7 @@ function _computeSystemLimitAndPlaceBoundaries(
         const rowCenterY = (poRowY[rank] ?? startY) + PROCESS_H / 2;
         const ys = _distributeCentered(rightStates.length, STATE_H, config.hGap, rowCenterY);
         for (let i = 0; i < rightStates.length; i++) {
-            const s = rightStates[i];
-            boundaryElements.push({
-                id: s.id,
-                type: 'state',
-                label: s.label,
-                x: slRight - STATE_MAX_W / 2,
-                y: ys[i],
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: s.stateType,
-                lineNumber: s.lineNumber,
-            });
+            boundaryElements.push(_stateElement(rightStates[i], slRight - STATE_MAX_W / 2, ys[i]));
         }
     }
 
@@ -723,38 +744,42 @@ function _computeSystemLimitAndPlaceBoundaries(
 function _createConnections(
     flows: Flow[],
     usages: Usage[],
-    boundaryTopIds: Set<string>,
-    boundaryBottomIds: Set<string>,
-    backwardIds: Set<string>,
+    boundaryTopIds: ReadonlySet<string>,
+    boundaryBottomIds: ReadonlySet<string>,
+    backwardIds: ReadonlySet<string>,
 ): LayoutConnection[] {
     const connections: LayoutConnection[] = [];
 
     for (const flow of flows) {
-        const conn: LayoutConnection = {
+        // Resolve the routing hints first so every flow connection is created
+        // with the same set of keys instead of gaining them one by one
+        let sourceSide: string | undefined;
+        let targetSide: string | undefined;
+        if (backwardIds.has(flow.targetRef)) {
+            sourceSide = 'left';
+            targetSide = 'bottom';
+        } else if (backwardIds.has(flow.sourceRef)) {
+            sourceSide = 'top';
+            targetSide = 'left';
+        } else {
+            if (boundaryTopIds.has(flow.sourceRef)) {
+                sourceSide = 'bottom';
+            }
+            if (boundaryBottomIds.has(flow.targetRef)) {
+                targetSide = 'top';
+            }
+        }
+
+        connections.push({
             id: flow.id,
             sourceId: flow.sourceRef,
             targetId: flow.targetRef,
             flowType: flow.flowType,
             isUsage: false,
             lineNumber: flow.lineNumber,
-        };
-
-        if (boundaryTopIds.has(flow.sourceRef)) {
-            conn.sourceSide = 'bottom';
-        }
-        if (boundaryBottomIds.has(flow.targetRef)) {
-            conn.targetSide = 'top';
-        }
-
-        if (backwardIds.has(flow.targetRef)) {
-            conn.sourceSide = 'left';
-            conn.targetSide = 'bottom';
-        } else if (backwardIds.has(flow.sourceRef)) {
-            conn.sourceSide = 'top';
-            conn.targetSide = 'left';
-        }
-
-        connections.push(conn);
+            sourceSide,
+            targetSide,
+        });
     }
 
     for (const usage of usages) {
@@ -770,8 +795,51 @@ function _createConnections(
     return connections;
 }
 
+const NO_IDS: ReadonlySet<string> = new Set();
+
 // ---------- Single-system layout (orchestrator) ----------
 
+/**
+ * Layout of a system without process operators or flows. Every state is
+ * disconnected and nothing is ranked, so phases 0–5 are skipped and only
+ * the resources and the row of disconnected states are placed, exactly as
+ * the full pipeline would place them.
+ */
+function _computeUnconnectedLayout(
+    states: State[],
+    technicalResources: TechnicalResource[],
+    usages: Usage[],
+    config: LayoutConfig,
+    offsetX: number,
+    offsetY: number,
+): [LayoutElement[], LayoutConnection[], BoundsRect | null] {
+    const startX = offsetX + config.padding;
+    const startY = offsetY + config.padding;
+    const elements: LayoutElement[] = [];
+
+    // Resources stack in a column since there is no PO row to align with
+    const trStartX = startX + PROCESS_W + config.resourceOffsetX * 2;
+    for (let i = 0; i < technicalResources.length; i++) {
+        const trY = startY + i * (RESOURCE_H + config.hGap);
+        elements.push(_resourceElement(technicalResources[i], trStartX, trY));
+    }
+
+    if (states.length > 0) {
+        let maxElY = elements.length > 0 ? -Infinity : startY;
+        for (const e of elements) {
+            maxElY = Math.max(maxElY, e.y + e.height);
+        }
+        const dStartY = maxElY + config.vGap;
+        let cx = startX;
+        for (const s of states) {
+            elements.push(_stateElement(s, cx, dStartY));
+            cx += STATE_MAX_W + config.hGap;
+        }
+    }
+
+    return [elements, _createConnections([], usages, NO_IDS, NO_IDS, NO_IDS), null];
+}
+
 function _computeSingleSystemLayout(
     states: State[],
     processOperators: ProcessOperator[],
@@ -785,12 +853,22 @@ function _computeSingleSystemLayout(
     if (states.length === 0 && processOperators.length === 0) {
         return [[], [], null];
     }
+    if (processOperators.length === 0 && flows.length === 0) {
+        return _computeUnconnectedLayout(
+            states,
+            technicalResources,
+            usages,
+            config,
+            offsetX,
+            offsetY,
+        );
+    }
 
     // Phase 0–3: Build graph, topological sort, classify states
     const graph = _buildConnectivityGraph(states, processOperators, flows, usages);
     const [poOrder, poRank] = _topologicalSortPos(processOperators, states, graph);
-    const rankValues = Object.values(poRank);
-    const maxRank = rankValues.length > 0 ? Math.max(...rankValues) : -1;
+    // Every PO gets its own consecutive rank, so the last one holds the maximum
+    const maxRank = poOrder.length - 1;
     const affinities = _assignStateAffinities(states, graph, poRank, maxRank);
     const classified = _groupStatesByCategory(states, affinities);
 
@@ -803,17 +881,17 @@ function _computeSingleSystemLayout(
     const topBoundaryHeight = classified.boundaryTop.length > 0 ? STATE_H + config.vGap : 0;
     let currentY = startY + topBoundaryHeight;
 
-    // 4a) Compute PO row Y positions
-    const poRowY: Record<number, number> = {};
+    // 4a) Compute PO row Y positions (ranks are dense, so a plain array indexed by rank)
+    const poRowY: number[] = [];
     for (let rank = 0; rank <= maxRank; rank++) {
-        const leftCount = (boundaryLeft[rank] || []).length;
-        const rightCount = (classified.boundaryRight[rank] || []).length;
+        const leftCount = boundaryLeft[rank]?.length ?? 0;
+        const rightCount = classified.boundaryRight[rank]?.length ?? 0;
         const maxSideCount = Math.max(leftCount, rightCount);
         const sideHeight =
             maxSideCount > 0 ? maxSideCount * (STATE_H + config.hGap) - config.hGap : 0;
         const rowHeight = Math.max(PROCESS_H, sideHeight);
 
-        poRowY[rank] = currentY + (rowHeight - PROCESS_H) / 2;
+        poRowY.push(currentY + (rowHeight - PROCESS_H) / 2);
         currentY += rowHeight;
 
         if (classified.hasIntermediatesBelow.has(rank)) {
@@ -834,45 +912,32 @@ function _computeSingleSystemLayout(
     const coreLeftX = startX + leftSpace;
     const poCenterX = coreLeftX + PROCESS_W / 2;
 
+    // Index POs once instead of scanning the list for every ranked id
+    // (first occurrence wins, matching the previous linear search)
+    const poById = new Map<string, ProcessOperator>();
+    for (const p of processOperators) {
+        if (!poById.has(p.id)) poById.set(p.id, p);
+    }
+
     const poElements: Record<string, LayoutElement> = {};
     for (const poId of poOrder) {
-        const po = processOperators.find((p) => p.id === poId)!;
-        const el: LayoutElement = {
-            id: po.id,
-            type: 'processOperator',
-            label: po.label,
-            x: coreLeftX,
-            y: poRowY[poRank[poId] ?? 0] ?? startY,
-            width: PROCESS_W,
-            height: PROCESS_H,
-            lineNumber: po.lineNumber,
-        };
+        const po = poById.get(poId)!;
+        const el = _processElement(po, coreLeftX, poRowY[poRank.get(poId)!]);
         elements.push(el);
         poElements[po.id] = el;
     }
 
     // 4c) Position forward-edge internal states
-    for (const [key, gapStates] of Object.entries(internalsByGap)) {
-        const parts = key.split('-');
-        const sRank = parseInt(parts[0], 10);
-        const tRank = parseInt(parts[1], 10);
+    for (const gap of internalsByGap.values()) {
+        const sRank = gap.sourceRank;
+        const tRank = gap.targetRank;
+        const gapStates = gap.states;
         const sourcePOY = poRowY[sRank] ?? startY;
         const nextRowY = poRowY[Math.min(sRank + 1, tRank)] ?? poRowY[tRank] ?? startY;
         const midY = (sourcePOY + PROCESS_H + nextRowY) / 2 - STATE_H / 2;
         const xs = _distributeCentered(gapStates.length, STATE_MAX_W, config.hGap, poCenterX);
         for (let i = 0; i < gapStates.length; i++) {
-            const s = gapStates[i];
-            elements.push({
-                id: s.id,
-                type: 'state',
-                label: s.label,
-                x: xs[i],
-                y: midY,
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: s.stateType,
-                lineNumber: s.lineNumber,
-            });
+            elements.push(_stateElement(gapStates[i], xs[i], midY));
         }
     }
 
@@ -888,24 +953,14 @@ function _computeSingleSystemLayout(
             const maxR = Math.max(sRankVal, tRankVal);
             const midY =
                 ((poRowY[minR] ?? startY) + PROCESS_H + (poRowY[maxR] ?? startY)) / 2 - STATE_H / 2;
-            elements.push({
-                id: state.id,
-                type: 'state',
-                label: state.label,
-                x: feedbackX,
-                y: midY,
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: state.stateType,
-                lineNumber: state.lineNumber,
-            });
+            elements.push(_stateElement(state, feedbackX, midY));
         }
     }
 
     // Phase 5: System limit and boundary state placement
     const internalIds = new Set<string>();
-    for (const key of Object.keys(internalsByGap)) {
-        for (const s of internalsByGap[key]) {
+    for (const gap of internalsByGap.values()) {
+        for (const s of gap.states) {
             internalIds.add(s.id);
         }
     }
@@ -942,50 +997,24 @@ function _computeSingleSystemLayout(
         const trY = poEl
             ? poEl.y + (poEl.height - RESOURCE_H) / 2
             : (poRowY[0] ?? startY) + i * (RESOURCE_H + config.hGap);
-        elements.push({
-            id: tr.id,
-            type: 'technicalResource',
-            label: tr.label,
-            x: trStartX,
-            y: trY,
-            width: RESOURCE_W,
-            height: RESOURCE_H,
-            lineNumber: tr.lineNumber,
-        });
+        elements.push(_resourceElement(tr, trStartX, trY));
     }
 
     // Disconnected elements
     const disconnectedPos = processOperators.filter((p) => !graph.allFlowRefs.has(p.id));
     if (disconnectedStates.length > 0 || disconnectedPos.length > 0) {
-        const maxElY =
-            elements.length > 0 ? Math.max(...elements.map((e) => e.y + e.height)) : startY;
+        let maxElY = elements.length > 0 ? -Infinity : startY;
+        for (const e of elements) {
+            maxElY = Math.max(maxElY, e.y + e.height);
+        }
         const dStartY = maxElY + config.vGap;
         let cx = startX;
         for (const s of disconnectedStates) {
-            elements.push({
-                id: s.id,
-                type: 'state',
-                label: s.label,
-                x: cx,
-                y: dStartY,
-                width: STATE_MAX_W,
-                height: STATE_H,
-                stateType: s.stateType,
-                lineNumber: s.lineNumber,
-            });
+            elements.push(_stateElement(s, cx, dStartY));
             cx += STATE_MAX_W + config.hGap;
         }
         for (const p of disconnectedPos) {
-            elements.push({
-                id: p.id,
-                type: 'processOperator',
-                label: p.label,
-                x: cx,
-                y: dStartY,
-                width: PROCESS_W,
-                height: PROCESS_H,
-                lineNumber: p.lineNumber,
-            });
+            elements.push(_processElement(p, cx, dStartY));
             cx += PROCESS_W + config.hGap;
         }
     }
@@ -1002,6 +1031,20 @@ function _computeSingleSystemLayout(
     return [elements, connections, systemLimit];
 }
 
+/** Items grouped by systemId, each group in list order. */
+function _groupBySystem<T extends { systemId?: string }>(items: T[]): Map<string | undefined, T[]> {
+    const groups = new Map<string | undefined, T[]>();
+    for (const item of items) {
+        const group = groups.get(item.systemId);
+        if (group) {
+            group.push(item);
+        } else {
+            groups.set(item.systemId, [item]);
+        }
+    }
+    return groups;
+}
+
 function _deduplicateElements(elements: LayoutElement[]): LayoutElement[] {
     const seen = new Set<string>();
     const result: LayoutElement[] = [];
@@ -1021,6 +1064,14 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         config = createLayoutConfig();
     }
 
+    // Group every element list by system once, instead of filtering the full
+    // lists again for each system
+    const statesBySystem = _groupBySystem(model.states);
+    const processesBySystem = _groupBySystem(model.processOperators);
+    const resourcesBySystem = _groupBySystem(model.technicalResources);
+    const flowsBySystem = _groupBySystem(model.flows);
+    const usagesBySystem = _groupBySystem(model.usages);
+
     // Determine unique system IDs
     const systemIds: (string | undefined)[] = [];
     const systemLabels = new Map<string | undefined, string>();
@@ -1031,14 +1082,10 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
     }
 
     const seenIds = new Set<string | undefined>(systemIds);
-    const elemLists: Array<Array<State | ProcessOperator | TechnicalResource>> = [
-        model.states,
-        model.processOperators,
-        model.technicalResources,
-    ];
-    for (const elemList of elemLists) {
-        for (const elem of elemList) {
-            const sid = elem.systemId;
+    const elemGroups = [statesBySystem, processesBySystem, resourcesBySystem];
+    for (const grouped of elemGroups) {
+        // Map keys keep first-seen order, matching a scan of the element list
+        for (const sid of grouped.keys()) {
             if (sid !== undefined && !seenIds.has(sid)) {
                 systemIds.push(sid);
                 systemLabels.set(sid, sid);
@@ -1047,18 +1094,7 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         }
     }
 
-    let hasNone = false;
-    for (const elemList of elemLists) {
-        for (const elem of elemList) {
-            if (elem.systemId === undefined) {
-                hasNone = true;
-                break;
-            }
-        }
-        if (hasNone) {
-            break;
-        }
-    }
+    const hasNone = elemGroups.some((grouped) => grouped.has(undefined));
     if (hasNone && !seenIds.has(undefined)) {
         systemIds.push(undefined);
         systemLabels.set(undefined, 'System');
@@ -1070,17 +1106,10 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         systemLabels.set(undefined, 'System');
     }
 
-    function _filterBySystem<T extends { systemId?: string }>(
-        items: T[],
-        sid: string | undefined,
-    ): T[] {
-        return items.filter((item) => item.systemId === sid);
-    }
-
     const systemGap = config.hGap * 3;
 
     // Cross-system flows (State -> State between different systems)
-    const crossSystemFlows = model.flows.filter((f) => f.systemId === undefined);
+    const crossSystemFlows = flowsBySystem.get(undefined) ?? [];
 
     // State-to-system lookup
     const stateSystemMap: Record<string, string> = {};
@@ -1095,11 +1124,11 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
     const systemResults: SystemResult[] = [];
 
     for (const sid of systemIds) {
-        const sysStates = _filterBySystem(model.states, sid);
-        const sysProcesses = _filterBySystem(model.processOperators, sid);
-        const sysResources = _filterBySystem(model.technicalResources, sid);
-        const sysFlows = _filterBySystem(model.flows, sid);
-        const sysUsages = _filterBySystem(model.usages, sid);
+        const sysStates = statesBySystem.get(sid) ?? [];
+        const sysProcesses = processesBySystem.get(sid) ?? [];
+        const sysResources = resourcesBySystem.get(sid) ?? [];
+        const sysFlows = flowsBySystem.get(sid) ?? [];
+        const sysUsages = usagesBySystem.get(sid) ?? [];
 
         if (sysStates.length === 0 && sysProcesses.length === 0 && sysResources.length === 0) {
             continue;
@@ -1136,10 +1165,16 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         if (elems.length === 0) {
             return null;
         }
-        const minX = Math.min(...elems.map((e) => e.x + dx));
-        const minY = Math.min(...elems.map((e) => e.y + dy));
-        const maxX = Math.max(...elems.map((e) => e.x + dx + e.width));
-        const maxY = Math.max(...elems.map((e) => e.y + dy + e.height));
+        let minX = Infinity;
+        let minY = Infinity;
+        let maxX = -Infinity;
+        let maxY = -Infinity;
+        for (const e of elems) {
+            minX = Math.min(minX, e.x + dx);
+            minY = Math.min(minY, e.y + dy);
+            maxX = Math.max(maxX, e.x + dx + e.width);
+            maxY = Math.max(maxY, e.y + dy + e.height);
+        }
         return { x: minX, y: minY, width: maxX - minX, height: maxY - minY };
     }
 
@@ -1230,6 +1265,8 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         const sr = systemResults[i];
         const srSid = sr.sid;
 
+        const localById = new Map(sr.elements.map((e) => [e.id, e]));
+
         // Find cross-system flows connecting this system to already-placed systems
         const connectedPairs: Array<{ srcId: string; tgtId: string }> = [];
         for (const flow of crossSystemFlows) {
@@ -1250,7 +1287,7 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
             let total = 0.0;
             for (const pair of connectedPairs) {
                 const placedEl = elementPos[pair.srcId];
-                const localEl = sr.elements.find((e) => e.id === pair.tgtId);
+                const localEl = localById.get(pair.tgtId);
                 if (placedEl && localEl) {
                     const placedCy = placedEl.y + placedEl.h / 2;
                     const localCy = localEl.y + localEl.height / 2;
@@ -1267,7 +1304,7 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
             let total = 0.0;
             for (const pair of connectedPairs) {
                 const placedEl = elementPos[pair.srcId];
-                const localEl = sr.elements.find((e) => e.id === pair.tgtId);
+                const localEl = localById.get(pair.tgtId);
                 if (placedEl && localEl) {
                     const pcx = placedEl.x + placedEl.w / 2;
                     const pcy = placedEl.y + placedEl.h / 2;
@@ -1363,9 +1400,17 @@ export function computeLayout(model: ProcessModel, config?: LayoutConfig): Diagr
         const offset = systemOffset.get(sr.sid) ?? [0.0, 0.0];
         const [dx, dy] = offset;
 
-        for (const el of sr.elements) {
-            const shifted: LayoutElement = { ...el, x: el.x + dx, y: el.y + dy };
-            allElements.push(shifted);
+        if (dx === 0 && dy === 0) {
+            // The first (often only) system stays at the origin; its elements
+            // were created for this layout and need no shifted copy
+            for (const el of sr.elements) {
+                allElements.push(el);
+            }
+        } else {
+            for (const el of sr.elements) {
+                const shifted: LayoutElement = { ...el, x: el.x + dx, y: el.y + dy };
+                allElements.push(shifted);
+            }
         }
 
         allConnections.push(...sr.connections);
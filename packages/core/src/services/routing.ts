@@ -79,6 +79,8 @@ interface RoutingMeta {
 interface PortGroupEntry {
     metaIndex: number;
     role: 'source' | 'target';
+    /** Position of the connected element along the port side, used for ordering. */
+    sortPos: number;
 }
 
 interface PortGroup {
@@ -114,21 +116,29 @@ export function computeRouting(
         metas.push({ conn, source, target, sourceSide: sSide, targetSide: tSide, isDirect });
     }
 
-    // Step 2: group by (elementId, side)
+    // Step 2: group by (elementId, side), keyed by the connected element's
+    // position along that side so each group is ordered without recomputing centers
     const portGroups: Record<string, PortGroup> = {};
+    const addEntry = (
+        el: LayoutElement,
+        side: string,
+        connected: LayoutElement,
+        entry: Omit<PortGroupEntry, 'sortPos'>,
+    ) => {
+        const key = `${el.id}:${side}`;
+        let group = portGroups[key];
+        if (!group) {
+            group = { element: el, side, entries: [] };
+            portGroups[key] = group;
+        }
+        const [cx, cy] = centerOf(connected);
+        const sortPos = side === 'left' || side === 'right' ? cy : cx;
+        group.entries.push({ ...entry, sortPos });
+    };
     for (let i = 0; i < metas.length; i++) {
         const m = metas[i];
-        const sKey = `${m.source.id}:${m.sourceSide}`;
-        if (!portGroups[sKey]) {
-            portGroups[sKey] = { element: m.source, side: m.sourceSide, entries: [] };
-        }
-        portGroups[sKey].entries.push({ metaIndex: i, role: 'source' });
-
-        const tKey = `${m.target.id}:${m.targetSide}`;
-        if (!portGroups[tKey]) {
-            portGroups[tKey] = { element: m.target, side: m.targetSide, entries: [] };
-        }
-        portGroups[tKey].entries.push({ metaIndex: i, role: 'target' });
+        addEntry(m.source, m.sourceSide, m.target, { metaIndex: i, role: 'source' });
+        addEntry(m.target, m.targetSide, m.source, { metaIndex: i, role: 'target' });
     }
 
     // Step 3: assign port positions
@@ -137,21 +147,7 @@ export function computeRouting(
 
     for (const group of Object.values(portGroups)) {
         const { element: el, side, entries } = group;
-        const useY = side === 'left' || side === 'right';
-
-        entries.sort((a, b) => {
-            const mA = metas[a.metaIndex];
-            const connectedA = a.role === 'source' ? mA.target : mA.source;
-            const [cxA, cyA] = centerOf(connectedA);
-            const posA = useY ? cyA : cxA;
-
-            const mB = metas[b.metaIndex];
-            const connectedB = b.role === 'source' ? mB.target : mB.source;
-            const [cxB, cyB] = centerOf(connectedB);
-            const posB = useY ? cyB : cxB;
-
-            return posA - posB;
-        });
+        entries.sort((a, b) => a.sortPos - b.sortPos);
 
         const count = entries.length;
         for (let idx = 0; idx < entries.length; idx++) {
@@ -198,43 +194,44 @@ export function computeContentBounds(
     const charW = STATE_LABEL_FONT_SIZE * 0.6;
     const slCharW = SYSTEM_LIMIT_LABEL_FONT_SIZE * 0.6;
 
-    const allX: number[] = [];
-    const allY: number[] = [];
-    const allRight: number[] = [];
-    const allBottom: number[] = [];
+    if (elements.length === 0 && systemLimits.length === 0) {
+        return { x: 0, y: 0, width: 800, height: 600 };
+    }
+
+    // Track the extents in one pass instead of collecting per-side arrays
+    let minX = Infinity;
+    let minY = Infinity;
+    let maxX = -Infinity;
+    let maxY = -Infinity;
 
     for (const e of elements) {
-        allRight.push(e.x + e.width);
-        allBottom.push(e.y + e.height);
+        maxX = Math.max(maxX, e.x + e.width);
+        maxY = Math.max(maxY, e.y + e.height);
         if (e.type === 'state') {
             const longest = Math.max(e.id.length, (e.label || '').length);
             const labelWidth = longest * charW;
             const anchorX = e.x + e.width / 2 - 6;
-            allX.push(anchorX - labelWidth);
-            allY.push(e.y - 35);
+            minX = Math.min(minX, anchorX - labelWidth);
+            minY = Math.min(minY, e.y - 35);
         } else {
-            allX.push(e.x);
-            allY.push(e.y);
+            minX = Math.min(minX, e.x);
+            minY = Math.min(minY, e.y);
         }
     }
 
     for (const sl of systemLimits) {
-        allX.push(sl.x);
-        allBottom.push(sl.y + sl.height);
+        minX = Math.min(minX, sl.x);
+        maxY = Math.max(maxY, sl.y + sl.height);
         const slLabelW = (sl.label || '').length * slCharW;
-        allRight.push(sl.x + sl.width + slLabelW);
-        allY.push(sl.y - SYSTEM_LIMIT_LABEL_FONT_SIZE - 5);
-    }
-
-    if (allX.length === 0) {
-        return { x: 0, y: 0, width: 800, height: 600 };
+        maxX = Math.max(maxX, sl.x + sl.width + slLabelW);
+        minY = Math.min(minY, sl.y - SYSTEM_LIMIT_LABEL_FONT_SIZE - 5);
     }
 
     const margin = 50;
-    const minX = Math.min(...allX) - margin;
-    const minY = Math.min(...allY) - margin;
-    const maxX = Math.max(...allRight) + margin;
-    const maxY = Math.max(...allBottom) + margin;
+    minX -= margin;
+    minY -= margin;
+    maxX += margin;
+    maxY += margin;
     return { x: minX, y: minY, width: maxX - minX, height: maxY - minY };
 }
 